@@ -3,8 +3,14 @@ Configuración de la base de datos para el proyecto ETL.
 Este módulo maneja la conexión y configuración de SQLite.
 """
 
+import atexit
+import functools
+import itertools
 import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
@@ -29,40 +35,276 @@ class DatabaseConfig:
         self.db_type = os.getenv('DB_TYPE', 'sqlite')
         self.table_source = os.getenv('DB_TABLE_SOURCE', 'sales_data')
         self.table_target = os.getenv('DB_TABLE_TARGET', 'sales_transformed')
+        self.chunk_size = int(os.getenv('CHUNK_SIZE', 500))
         
-        # Crear directorio si no existe
-        db_dir = Path(self.db_path).parent
-        db_dir.mkdir(parents=True, exist_ok=True)
+        # El directorio se crea al abrir la primera conexión, no al importar
+        self._dir_checked = False
+        # True cuando el archivo existe y tiene WAL activado (persiste en el archivo)
+        self._wal_ready = False
+        
+        # Conexión de escritura persistente por hilo, se abre en el primer uso.
+        # Se registran todas para cerrarlas al terminar el proceso
+        self._tls = threading.local()
+        self._rw_conns = set()
+        self._rw_conns_lock = threading.Lock()
+        atexit.register(self._close_all)
+        
+        # Pool de conexiones de solo lectura (WAL permite lectores en paralelo)
+        self._reader_pool_size = min(os.cpu_count() or 1, 4)
+        self._readers = queue.Queue(maxsize=self._reader_pool_size)
+        self._readers_created = 0
+        self._readers_lock = threading.Lock()
+        
+        # Cachés de metadatos: el esquema no cambia dentro de una ejecución
+        # salvo por DDL propio, tras el cual se llama a invalidate_schema_cache()
+        self._known_tables = None
+        self._table_info_cached = functools.lru_cache(maxsize=128)(self._query_table_info)
         
         logger.info(f"Configuración de BD inicializada: {self.db_path}")
     
+    def ensure_dir(self):
+        """Crea el directorio de la base de datos si aún no se ha comprobado."""
+        if not self._dir_checked:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._dir_checked = True
+    
+    def _get_or_create_connection(self):
+        """
+        Retorna la conexión persistente del hilo actual, creándola en el primer uso.
+        
+        La conexión se abre en modo autocommit (isolation_level=None) y se
+        reutiliza en todas las consultas del hilo para evitar reabrir el
+        archivo. Cada hilo (p. ej. tareas del LocalExecutor) tiene la suya,
+        de modo que nunca se comparte una transacción entre hilos.
+        
+        Returns:
+            sqlite3.Connection: Conexión del hilo actual a la base de datos
+        """
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            self.ensure_dir()
+            try:
+                # check_same_thread=False solo para poder cerrarla desde atexit
+                conn = sqlite3.connect(
+                    self.db_path,
+                    check_same_thread=False,
+                    isolation_level=None,
+                    cached_statements=256
+                )
+                self._configure(conn)
+                self._wal_ready = True
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Conexión establecida a: {self.db_path}")
+            except sqlite3.Error as e:
+                logger.error(f"Error al conectar a la base de datos: {e}")
+                raise
+            self._tls.conn = conn
+            with self._rw_conns_lock:
+                self._rw_conns.add(conn)
+        return conn
+    
+    def _configure(self, conn, readonly=False):
+        """
+        Aplica los PRAGMA de rendimiento a una conexión recién abierta.
+        
+        WAL con synchronous=NORMAL agrupa los fsync por checkpoint, y la
+        caché de páginas y el mmap mantienen en memoria las lecturas del ETL.
+        
+        Args:
+            conn (sqlite3.Connection): Conexión a configurar
+            readonly (bool): Si True, omite los PRAGMA que requieren escritura
+        """
+        if not readonly:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA busy_timeout=5000")
+    
     def get_connection(self):
         """
-        Crea y retorna una conexión a la base de datos SQLite.
+        Retorna la conexión a la base de datos SQLite.
+        
+        La conexión es persistente y se comparte entre llamadas del mismo
+        hilo; usa `close()` para cerrarla al finalizar.
         
         Returns:
             sqlite3.Connection: Objeto de conexión a la base de datos
         """
+        return self._get_or_create_connection()
+    
+    def close_connection(self, conn):
+        """
+        Cierra una conexión a la base de datos.
+        
+        La conexión persistente no se cierra aquí para poder reutilizarla;
+        se cierra con `close()`.
+        
+        Args:
+            conn: Objeto de conexión a cerrar
+        """
+        if conn and conn is not getattr(self._tls, 'conn', None):
+            conn.close()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Conexión cerrada correctamente")
+    
+    def close(self):
+        """Cierra la conexión persistente del hilo actual y las conexiones de lectura."""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is not None:
+            self._tls.conn = None
+            with self._rw_conns_lock:
+                self._rw_conns.discard(conn)
+            conn.close()
+        
+        with self._readers_lock:
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._readers_created = 0
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Conexión cerrada correctamente")
+    
+    def _close_all(self):
+        """Cierra las conexiones de todos los hilos; se ejecuta al salir del proceso."""
+        with self._rw_conns_lock:
+            conns, self._rw_conns = self._rw_conns, set()
+        for conn in conns:
+            conn.close()
+        self.close()
+    
+    def _ensure_wal(self):
+        """
+        Crea el archivo de la base de datos y activa WAL antes del primer lector.
+        
+        Un lector de solo lectura no puede crear el archivo ni cambiar el modo
+        de journal. Se usa una conexión temporal en lugar de la de escritura
+        del hilo, para no dejar conexiones abiertas en hilos de trabajo.
+        """
+        if self._wal_ready:
+            return
+        self.ensure_dir()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        self._wal_ready = True
+    
+    def acquire_reader(self):
+        """
+        Obtiene una conexión de solo lectura del pool.
+        
+        Las conexiones se crean bajo demanda hasta el tamaño del pool; si
+        todas están en uso, espera a que se libere una.
+        
+        Returns:
+            sqlite3.Connection: Conexión de solo lectura
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            logger.info(f"Conexión establecida a: {self.db_path}")
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._readers_lock:
+            create = self._readers_created < self._reader_pool_size
+            if create:
+                self._readers_created += 1
+        
+        if not create:
+            return self._readers.get()
+        
+        try:
+            self._ensure_wal()
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                check_same_thread=False
+            )
+            self._configure(conn, readonly=True)
             return conn
         except sqlite3.Error as e:
-            logger.error(f"Error al conectar a la base de datos: {e}")
+            with self._readers_lock:
+                self._readers_created -= 1
+            logger.error(f"Error al abrir conexión de lectura: {e}")
             raise
     
-    def close_connection(self, conn):
+    def release_reader(self, conn):
         """
-        Cierra la conexión a la base de datos.
+        Devuelve una conexión de solo lectura al pool.
         
         Args:
-            conn: Objeto de conexión a cerrar
+            conn (sqlite3.Connection): Conexión obtenida con `acquire_reader()`
         """
-        if conn:
-            conn.close()
-            logger.info("Conexión cerrada correctamente")
+        self._readers.put(conn)
     
-    def execute_query(self, query, params=None, fetch=False):
+    @contextmanager
+    def reader(self):
+        """
+        Context manager que presta una conexión de solo lectura del pool.
+        
+        Yields:
+            sqlite3.Connection: Conexión de solo lectura
+        """
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader(conn)
+    
+    @contextmanager
+    def session(self, conn=None):
+        """
+        Context manager sobre la conexión persistente de escritura.
+        
+        No cierra la conexión al salir, de modo que la caché de páginas y los
+        PRAGMA se conservan entre llamadas; si ocurre una excepción con una
+        transacción abierta, la revierte antes de propagarla.
+        
+        Args:
+            conn (sqlite3.Connection, optional): Conexión a usar (por defecto
+                la conexión de escritura del hilo actual)
+            
+        Yields:
+            sqlite3.Connection: Conexión de escritura
+        """
+        conn = conn or self._get_or_create_connection()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    
+    @contextmanager
+    def bulk_connection(self, conn=None):
+        """
+        Context manager para cargas masivas sobre la conexión de escritura.
+        
+        Desactiva el fsync (synchronous=OFF) durante la carga y restaura
+        synchronous=NORMAL al salir. El journal se mantiene en WAL: cambiarlo
+        a MEMORY exigiría cerrar los lectores y un fallo a mitad de carga
+        podría corromper el archivo en lugar de solo perder la transacción.
+        
+        Args:
+            conn (sqlite3.Connection, optional): Conexión a ajustar (por
+                defecto la conexión de escritura del hilo actual)
+            
+        Yields:
+            sqlite3.Connection: Conexión de escritura
+        """
+        with self.session(conn) as conn:
+            conn.execute("PRAGMA synchronous=OFF")
+            try:
+                yield conn
+            finally:
+                conn.execute("PRAGMA synchronous=NORMAL")
+    
+    def execute_query(self, query, params=None, fetch=False, readonly=False):
         """
         Ejecuta una consulta SQL en la base de datos.
         
@@ -70,62 +312,212 @@ class DatabaseConfig:
             query (str): Consulta SQL a ejecutar
             params (tuple, optional): Parámetros para la consulta
             fetch (bool): Si True, retorna los resultados
+            readonly (bool): Si True, usa una conexión del pool de lectura
             
         Returns:
             list: Resultados de la consulta si fetch=True
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        if readonly:
+            try:
+                with self.reader() as conn:
+                    cursor = conn.execute(query, params or ())
+                    return cursor.fetchall() if fetch else None
+            except sqlite3.Error as e:
+                logger.error(f"Error ejecutando consulta: {e}")
+                raise
+        
+        conn = self._get_or_create_connection()
         
         try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            if fetch:
-                results = cursor.fetchall()
-                return results
-            else:
-                conn.commit()
-                logger.info("Consulta ejecutada exitosamente")
+            # El bloque `with` confirma o revierte la transacción activa
+            with conn:
+                cursor = conn.execute(query, params or ())
+                
+                if fetch:
+                    return cursor.fetchall()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Consulta ejecutada exitosamente")
         except sqlite3.Error as e:
             logger.error(f"Error ejecutando consulta: {e}")
-            conn.rollback()
             raise
-        finally:
-            cursor.close()
-            self.close_connection(conn)
+    
+    def execute_script(self, statements, conn=None):
+        """
+        Ejecuta varias sentencias SQL (p. ej. DDL) en una única transacción.
+        
+        Args:
+            statements (list): Sentencias SQL sin parámetros
+            conn (sqlite3.Connection, optional): Conexión a usar (por defecto
+                la conexión de escritura del hilo actual)
+        """
+        conn = conn or self._get_or_create_connection()
+        script = "BEGIN;\n" + ";\n".join(statements) + ";\nCOMMIT;"
+        
+        try:
+            conn.executescript(script)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Script ejecutado exitosamente: {len(statements)} sentencias")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Error ejecutando script: {e}")
+            raise
+    
+    def insert_rows(self, table_name, columns, rows, chunk_size=None, conn=None, pre_sql=None):
+        """
+        Inserta filas usando sentencias INSERT multi-fila dentro de una sola transacción.
+        
+        Cada sentencia agrupa `chunk_size` filas en un mismo VALUES, de modo
+        que SQLite ejecuta una sentencia por bloque en lugar de una por fila.
+        El tamaño del bloque se limita para no superar el máximo de
+        parámetros enlazables por sentencia.
+        
+        La carga es síncrona a propósito: con WAL y synchronous=NORMAL todo
+        el lote produce una única sincronización a disco en el COMMIT, así
+        que una capa asíncrona (aiosqlite ejecuta SQLite en un hilo aparte)
+        no tendría escrituras que solapar.
+        
+        Args:
+            table_name (str): Tabla destino
+            columns (list): Nombres de las columnas en el orden de las filas
+            rows (iterable): Secuencia de tuplas de valores
+            chunk_size (int, optional): Filas por sentencia (por defecto CHUNK_SIZE)
+            conn (sqlite3.Connection, optional): Conexión a usar (por defecto
+                la conexión de escritura del hilo actual)
+            pre_sql (list, optional): Sentencias sin parámetros que se ejecutan
+                dentro de la misma transacción antes de insertar (p. ej. el
+                DELETE que vacía la tabla al reemplazar su contenido)
+            
+        Returns:
+            int: Número de filas insertadas
+        """
+        max_variables = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+        chunk_size = chunk_size or self.chunk_size
+        chunk_size = max(1, min(chunk_size, max_variables // max(len(columns), 1)))
+        
+        column_list = ', '.join(f'"{col}"' for col in columns)
+        row_placeholder = f"({', '.join('?' * len(columns))})"
+        
+        def statement(n_rows):
+            return (f"INSERT INTO {table_name} ({column_list}) "
+                    f"VALUES {', '.join([row_placeholder] * n_rows)}")
+        
+        full_statement = statement(chunk_size)
+        conn = conn or self._get_or_create_connection()
+        inserted = 0
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for sql in pre_sql or ():
+                conn.execute(sql)
+            rows = iter(rows)
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                query = full_statement if len(chunk) == chunk_size else statement(len(chunk))
+                conn.execute(query, [value for row in chunk for value in row])
+                inserted += len(chunk)
+            conn.execute("COMMIT")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Inserción multi-fila completada: {inserted} filas")
+            return inserted
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Error en inserción multi-fila: {e}")
+            raise
+    
+    def insert_dataframe(self, df, table_name, chunk_size=None, conn=None, pre_sql=None):
+        """
+        Inserta todas las filas de un DataFrame en una tabla existente.
+        
+        Las filas se arman con `zip` sobre las columnas convertidas a listas
+        de una vez (`Series.tolist()` en C), sin el diccionario por fila que
+        construye `DataFrame.to_sql` ni el recorrido fila a fila de
+        `itertuples`.
+        
+        Args:
+            df (pd.DataFrame): Datos a insertar; sus columnas deben existir en la tabla
+            table_name (str): Tabla destino
+            chunk_size (int, optional): Filas por sentencia (por defecto CHUNK_SIZE)
+            conn (sqlite3.Connection, optional): Conexión a usar
+            pre_sql (list, optional): Sentencias a ejecutar en la misma
+                transacción antes de insertar (ver `insert_rows`)
+            
+        Returns:
+            int: Número de filas insertadas
+        """
+        return self.insert_rows(
+            table_name,
+            list(df.columns),
+            zip(*(df.iloc[:, i].tolist() for i in range(df.shape[1]))),
+            chunk_size=chunk_size,
+            conn=conn,
+            pre_sql=pre_sql
+        )
+    
+    def _query_table_names(self):
+        """Consulta sqlite_master y retorna el conjunto de tablas existentes."""
+        query = "SELECT name FROM sqlite_master WHERE type='table'"
+        return {row[0] for row in self.execute_query(query, fetch=True, readonly=True)}
+    
+    def _query_table_info(self, table_name):
+        """Consulta pragma_table_info sin pasar por la caché."""
+        query = """
+            SELECT cid, name, type, "notnull", dflt_value, pk
+            FROM pragma_table_info(?)
+        """
+        return tuple(self.execute_query(query, (table_name,), fetch=True, readonly=True))
     
     def table_exists(self, table_name):
         """
         Verifica si una tabla existe en la base de datos.
         
+        La primera llamada carga todos los nombres de tabla con una sola
+        consulta; las siguientes responden desde memoria hasta la próxima
+        llamada a `invalidate_schema_cache()`.
+        
         Args:
             table_name (str): Nombre de la tabla a verificar
             
         Returns:
             bool: True si la tabla existe, False en caso contrario
         """
-        query = """
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name=?
-        """
-        result = self.execute_query(query, (table_name,), fetch=True)
-        return len(result) > 0
+        if self._known_tables is None:
+            self._known_tables = self._query_table_names()
+        return table_name in self._known_tables
     
     def get_table_info(self, table_name):
         """
         Obtiene información sobre las columnas de una tabla.
         
+        El resultado se memoriza hasta la siguiente llamada a
+        `invalidate_schema_cache()`.
+        
         Args:
             table_name (str): Nombre de la tabla
             
         Returns:
             list: Información de las columnas
         """
-        query = f"PRAGMA table_info({table_name})"
-        return self.execute_query(query, fetch=True)
+        return list(self._table_info_cached(table_name))
+    
+    def register_table(self, table_name):
+        """
+        Registra una tabla recién creada sin volver a consultar sqlite_master.
+        
+        Args:
+            table_name (str): Nombre de la tabla creada
+        """
+        if self._known_tables is not None:
+            self._known_tables.add(table_name)
+        self._table_info_cached.cache_clear()
+    
+    def invalidate_schema_cache(self):
+        """Descarta los metadatos memorizados; llamar tras ejecutar DDL."""
+        self._known_tables = None
+        self._table_info_cached.cache_clear()
 
 
 # Instancia global de configuración
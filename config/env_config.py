@@ -0,0 +1,29 @@
+"""
+Variables de entorno del proyecto.
+Lee el archivo .env una sola vez al importar y expone `env()` para consultarlas.
+"""
+
+import os
+
+# python-dotenv puede faltar (verify_installation lo reporta como dependencia)
+try:
+    from dotenv import dotenv_values
+except ImportError:
+    dotenv_values = None
+
+# Variables de entorno leídas una sola vez (las del proceso tienen prioridad sobre .env)
+_ENV = {**(dotenv_values() if dotenv_values else {}), **os.environ}
+
+
+def env(key, default=None):
+    """
+    Retorna una variable de entorno desde la caché cargada al importar.
+
+    Args:
+        key (str): Nombre de la variable
+        default (str, optional): Valor si la variable no está definida
+
+    Returns:
+        str: Valor de la variable o `default`
+    """
+    return _ENV.get(key, default)
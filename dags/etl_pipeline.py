@@ -11,8 +11,8 @@ Fecha: 2025
 """
 
 from datetime import datetime, timedelta
-from airflow import DAG
-from airflow.operators.python import PythonOperator
+from airflow.datasets import Dataset
+from airflow.decorators import dag, task
 from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
 import sys
@@ -23,10 +23,9 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-# Importar las funciones ETL
-from scripts.extract_data import extract
-from scripts.transform_data import transform
-from scripts.load_data import load
+# Las funciones ETL (y con ellas pandas) se importan dentro de cada tarea:
+# el scheduler re-parsea este archivo continuamente y solo necesita la
+# estructura del DAG, no las dependencias de ejecución
 
 # ============================================================================
 # CONFIGURACIÓN DEL DAG
@@ -64,177 +63,173 @@ Este DAG implementa un proceso ETL completo para procesar datos de ventas:
 
 **Salidas**:
 - Tabla `sales_transformed` en la base de datos
-- Archivos CSV en `data/output/`
+- Archivos Parquet en `data/output/` (`extracted_data.parquet`, `transformed_data.parquet` y `transformed_data_full.parquet`)
 """
 
+# Dataset actualizado por la tarea de carga; permite disparar DAGs
+# consumidores sin sondear la base de datos
+sales_transformed_dataset = Dataset("sqlite://sales_transformed")
+
 # ============================================================================
 # DEFINICIÓN DEL DAG
 # ============================================================================
 
-# Crear el DAG
-dag = DAG(
+@dag(
     dag_id='etl_sales_pipeline',
     default_args=default_args,
     description='Pipeline ETL para procesar datos de ventas',
     doc_md=dag_description,
-    schedule_interval='0 0 * * *',  # Ejecutar diariamente a medianoche (cron: min hour day month dayofweek)
+    schedule='0 0 * * *',  # Ejecutar diariamente a medianoche (cron: min hour day month dayofweek)
     start_date=days_ago(1),  # Fecha de inicio (1 día atrás)
     catchup=False,  # No ejecutar para fechas pasadas
     tags=['etl', 'sales', 'data-pipeline', 'educational'],  # Tags para organización
     max_active_runs=1,  # Solo una ejecución activa a la vez
 )
-
-# ============================================================================
-# DEFINICIÓN DE TAREAS
-# ============================================================================
-
-# Tarea 1: Inicio del pipeline (documentación)
-start_task = BashOperator(
-    task_id='start_pipeline',
-    bash_command='echo "Iniciando pipeline ETL de ventas - $(date)"',
-    dag=dag,
-)
-
-# Tarea 2: Extracción de datos
-extract_task = PythonOperator(
-    task_id='extract_data',
-    python_callable=extract,
-    provide_context=True,  # Proporciona contexto de Airflow a la función
-    dag=dag,
-    doc_md="""
-    ### Tarea de Extracción
-    
-    Extrae datos desde la tabla `sales_data` en la base de datos SQLite.
+def etl_sales_pipeline():
+    """
+    Define las tareas del pipeline con la API TaskFlow.
     
-    **Acciones**:
-    - Conecta a la base de datos
-    - Ejecuta query SELECT para extraer todos los registros
-    - Valida los datos extraídos
-    - Guarda los datos en `data/output/extracted_data.csv`
+    Cada tarea retorna la ruta de su archivo de salida, que Airflow pasa por
+    XCom como argumento de la siguiente tarea.
+    """
     
-    **Salida**: Archivo CSV con datos extraídos
-    """,
-)
-
-# Tarea 3: Transformación de datos
-transform_task = PythonOperator(
-    task_id='transform_data',
-    python_callable=transform,
-    provide_context=True,
-    dag=dag,
-    doc_md="""
-    ### Tarea de Transformación
+    # ========================================================================
+    # DEFINICIÓN DE TAREAS
+    # ========================================================================
     
-    Limpia, valida y transforma los datos extraídos.
+    # Tarea 1: Inicio del pipeline (documentación)
+    start_task = BashOperator(
+        task_id='start_pipeline',
+        bash_command='echo "Iniciando pipeline ETL de ventas - $(date)"',
+    )
     
-    **Acciones**:
-    - Carga datos desde `extracted_data.csv`
-    - Limpia valores nulos y duplicados
-    - Elimina outliers usando método IQR
-    - Normaliza texto y formatos
-    - Agrega datos por producto, categoría y región
-    - Calcula métricas derivadas
+    # Tarea 2: Extracción de datos
+    @task(
+        task_id='extract_data',
+        doc_md="""
+        ### Tarea de Extracción
+        
+        Extrae datos desde la tabla `sales_data` en la base de datos SQLite.
+        
+        **Acciones**:
+        - Conecta a la base de datos
+        - Ejecuta query SELECT para extraer todos los registros
+        - Valida los datos extraídos
+        - Guarda los datos en `data/output/extracted_data.parquet`
+        
+        **Salida**: Ruta del archivo Parquet con datos extraídos
+        """,
+    )
+    def extract_task():
+        from scripts.extract_data import extract
+        return extract()
     
-    **Salida**: Archivo CSV con datos transformados
-    """,
-)
-
-# Tarea 4: Carga de datos
-load_task = PythonOperator(
-    task_id='load_data',
-    python_callable=load,
-    provide_context=True,
-    dag=dag,
-    doc_md="""
-    ### Tarea de Carga
+    # Tarea 3: Transformación de datos
+    @task(
+        task_id='transform_data',
+        doc_md="""
+        ### Tarea de Transformación
+        
+        Limpia, valida y transforma los datos extraídos.
+        
+        **Acciones**:
+        - Carga datos desde `extracted_data.parquet`
+        - Limpia valores nulos y duplicados
+        - Elimina outliers usando método IQR
+        - Normaliza texto y formatos
+        - Agrega datos por producto, categoría y región
+        - Calcula métricas derivadas
+        
+        **Salida**: Ruta del archivo con datos transformados
+        """,
+    )
+    def transform_task(extracted_path):
+        from scripts.transform_data import transform
+        return transform(input_path=extracted_path)
     
-    Carga los datos transformados en la base de datos destino.
+    # Tarea 4: Carga de datos
+    @task(
+        task_id='load_data',
+        outlets=[sales_transformed_dataset],
+        doc_md="""
+        ### Tarea de Carga
+        
+        Carga los datos transformados en la base de datos destino.
+        
+        **Acciones**:
+        - Carga datos desde `transformed_data.parquet`
+        - Valida datos antes de la carga
+        - Crea backup de datos existentes (opcional)
+        - Inserta datos en tabla `sales_transformed`
+        - Crea índices para optimizar consultas
+        - Genera estadísticas de carga
+        
+        **Salida**: Estadísticas de la carga; actualiza el Dataset
+        `sqlite://sales_transformed`
+        """,
+    )
+    def load_task(transformed_path):
+        from scripts.load_data import load
+        return load(input_path=transformed_path)
     
-    **Acciones**:
-    - Carga datos desde `transformed_data.csv`
-    - Valida datos antes de la carga
-    - Crea backup de datos existentes (opcional)
-    - Inserta datos en tabla `sales_transformed`
-    - Crea índices para optimizar consultas
-    - Genera estadísticas de carga
+    # Tarea 5: Generar reporte de ejecución (opcional)
+    @task(task_id='generate_report')
+    def generate_execution_report(extract_output, transform_output, load_output, **kwargs):
+        """
+        Genera un reporte resumido de la ejecución del pipeline.
+        """
+        import logging
+        
+        logger = logging.getLogger(__name__)
+        
+        # Obtener información del contexto de Airflow
+        execution_date = kwargs['execution_date']
+        
+        try:
+            logger.info("=" * 60)
+            logger.info("REPORTE DE EJECUCIÓN DEL PIPELINE ETL")
+            logger.info("=" * 60)
+            logger.info(f"Fecha de ejecución: {execution_date}")
+            logger.info(f"Hora de finalización: {datetime.now()}")
+            logger.info(f"\nArchivos generados:")
+            logger.info(f"  - Extract: {extract_output}")
+            logger.info(f"  - Transform: {transform_output}")
+            logger.info(f"\nEstadísticas de carga:")
+            if isinstance(load_output, dict):
+                logger.info(f"  - Registros cargados: {load_output.get('total_records', 'N/A')}")
+                logger.info(f"  - Total de ventas: ${load_output.get('total_sales', 0):,.2f}")
+            logger.info("=" * 60)
+            logger.info("✓ Pipeline ejecutado exitosamente")
+            logger.info("=" * 60)
+            
+        except Exception as e:
+            logger.warning(f"No se pudo generar reporte completo: {e}")
+            logger.info("Pipeline completado (reporte parcial)")
     
-    **Salida**: Datos cargados en la base de datos
-    """,
-)
-
-# Tarea 5: Finalización del pipeline
-end_task = BashOperator(
-    task_id='end_pipeline',
-    bash_command='echo "Pipeline ETL completado exitosamente - $(date)"',
-    dag=dag,
-)
-
-# Tarea 6: Generar reporte de ejecución (opcional)
-def generate_execution_report(**kwargs):
-    """
-    Genera un reporte resumido de la ejecución del pipeline.
-    """
-    import logging
-    from datetime import datetime
+    # Tarea 6: Finalización del pipeline
+    end_task = BashOperator(
+        task_id='end_pipeline',
+        bash_command='echo "Pipeline ETL completado exitosamente - $(date)"',
+    )
     
-    logger = logging.getLogger(__name__)
+    # ========================================================================
+    # DEFINICIÓN DE DEPENDENCIAS (FLUJO DEL PIPELINE)
+    # ========================================================================
     
-    # Obtener información del contexto de Airflow
-    ti = kwargs['ti']
-    execution_date = kwargs['execution_date']
+    # Las dependencias extract >> transform >> load >> report se infieren
+    # de los valores que cada tarea pasa a la siguiente
+    extracted_path = extract_task()
+    transformed_path = transform_task(extracted_path)
+    load_stats = load_task(transformed_path)
+    report = generate_execution_report(extracted_path, transformed_path, load_stats)
     
-    # Intentar obtener información de las tareas anteriores usando XCom
-    try:
-        extract_output = ti.xcom_pull(task_ids='extract_data')
-        transform_output = ti.xcom_pull(task_ids='transform_data')
-        load_output = ti.xcom_pull(task_ids='load_data')
-        
-        logger.info("=" * 60)
-        logger.info("REPORTE DE EJECUCIÓN DEL PIPELINE ETL")
-        logger.info("=" * 60)
-        logger.info(f"Fecha de ejecución: {execution_date}")
-        logger.info(f"Hora de finalización: {datetime.now()}")
-        logger.info(f"\nArchivos generados:")
-        logger.info(f"  - Extract: {extract_output}")
-        logger.info(f"  - Transform: {transform_output}")
-        logger.info(f"\nEstadísticas de carga:")
-        if isinstance(load_output, dict):
-            logger.info(f"  - Registros cargados: {load_output.get('total_records', 'N/A')}")
-            logger.info(f"  - Total de ventas: ${load_output.get('total_sales', 0):,.2f}")
-        logger.info("=" * 60)
-        logger.info("✓ Pipeline ejecutado exitosamente")
-        logger.info("=" * 60)
-        
-    except Exception as e:
-        logger.warning(f"No se pudo generar reporte completo: {e}")
-        logger.info("Pipeline completado (reporte parcial)")
-
-report_task = PythonOperator(
-    task_id='generate_report',
-    python_callable=generate_execution_report,
-    provide_context=True,
-    dag=dag,
-)
-
-# ============================================================================
-# DEFINICIÓN DE DEPENDENCIAS (FLUJO DEL PIPELINE)
-# ============================================================================
-
-# Definir el orden de ejecución de las tareas
-# Sintaxis: tarea_anterior >> tarea_siguiente
+    # Las tareas Bash no intercambian datos, se encadenan explícitamente
+    start_task >> extracted_path
+    report >> end_task
 
-# Opción 1: Sintaxis encadenada (más legible)
-start_task >> extract_task >> transform_task >> load_task >> report_task >> end_task
 
-# Opción 2: Sintaxis alternativa (equivalente)
-# start_task.set_downstream(extract_task)
-# extract_task.set_downstream(transform_task)
-# transform_task.set_downstream(load_task)
-# load_task.set_downstream(report_task)
-# report_task.set_downstream(end_task)
-
-# Opción 3: Usando listas (para dependencias múltiples)
-# [start_task] >> extract_task >> transform_task >> load_task >> [report_task, end_task]
+# Crear el DAG
+dag = etl_sales_pipeline()
 
 # ============================================================================
 # DOCUMENTACIÓN ADICIONAL
@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 
@@ -81,17 +82,26 @@ def check_python_version():
     return True
 
 
-def run_command(command, description, check=True, shell=False):
-    """Ejecuta un comando del sistema."""
+def run_command(command, description, check=True, shell=False, stream=False):
+    """
+    Ejecuta un comando del sistema.
+    
+    Con stream=True la salida del comando se muestra directamente en la
+    terminal en lugar de acumularse en memoria; útil para comandos con
+    salida extensa como pip.
+    """
     try:
         print(f"  Ejecutando: {description}...")
-        result = subprocess.run(
-            command,
-            check=check,
-            capture_output=True,
-            text=True,
-            shell=shell
-        )
+        if stream:
+            subprocess.run(command, check=check, shell=shell)
+        else:
+            subprocess.run(
+                command,
+                check=check,
+                capture_output=True,
+                text=True,
+                shell=shell
+            )
         print_success(description)
         return True
     except subprocess.CalledProcessError as e:
@@ -108,21 +118,17 @@ def install_dependencies():
     """Instala las dependencias del proyecto."""
     print_step(1, 5, "Instalando Dependencias")
     
-    # Actualizar pip
-    if not run_command(
-        [sys.executable, "-m", "pip", "install", "--upgrade", "pip"],
-        "Actualizar pip"
-    ):
-        return False
-    
-    # Instalar dependencias
-    if not run_command(
-        [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
-        "Instalar dependencias del proyecto"
-    ):
-        return False
-    
-    return True
+    # Actualizar pip e instalar dependencias en una sola invocación
+    return run_command(
+        [
+            sys.executable, "-m", "pip", "install",
+            "--no-input", "--disable-pip-version-check",
+            "--upgrade", "pip",
+            "-r", "requirements.txt"
+        ],
+        "Actualizar pip e instalar dependencias del proyecto",
+        stream=True
+    )
 
 
 def create_directories():
@@ -137,9 +143,14 @@ def create_directories():
         'logs'
     ]
     
+    # Los directorios son independientes entre sí: crearlos en paralelo
+    with ThreadPoolExecutor(max_workers=len(directories)) as executor:
+        list(executor.map(
+            lambda directory: Path(directory).mkdir(parents=True, exist_ok=True),
+            directories
+        ))
+    
     for directory in directories:
-        path = Path(directory)
-        path.mkdir(parents=True, exist_ok=True)
         print_success(f"Directorio: {directory}")
     
     return True
@@ -190,7 +201,8 @@ def initialize_airflow():
     # Inicializar base de datos de Airflow
     if not run_command(
         ["airflow", "db", "init"],
-        "Inicializar base de datos de Airflow"
+        "Inicializar base de datos de Airflow",
+        stream=True
     ):
         print_warning("Si Airflow no está instalado, ejecuta: pip install apache-airflow==2.8.1")
         return False
@@ -320,7 +332,8 @@ def main():
                 env=os.environ
             )
             
-            # Iniciar webserver
+            # Iniciar webserver; el scheduler se detiene siempre al salir,
+            # incluso si el webserver falla, para no dejar procesos huérfanos
             try:
                 subprocess.run(
                     ["airflow", "webserver", "--port", "8080"],
@@ -328,7 +341,13 @@ def main():
                 )
             except KeyboardInterrupt:
                 print(f"\n{Colors.YELLOW}Deteniendo Airflow...{Colors.END}")
+            finally:
                 scheduler_process.terminate()
+                try:
+                    scheduler_process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    scheduler_process.kill()
+                    scheduler_process.wait()
                 print_success("Airflow detenido")
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}Operación cancelada{Colors.END}")
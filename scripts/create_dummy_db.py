@@ -6,12 +6,12 @@ Este script genera datos de ejemplo para demostrar el flujo ETL.
 import sqlite3
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Agregar el directorio raíz al path
 project_root = Path(__file__).parent.parent
@@ -29,6 +29,9 @@ logger = logging.getLogger(__name__)
 # Cargar variables de entorno
 load_dotenv()
 
+# Filas por bloque al escribir CSV
+CSV_CHUNK_SIZE = 50_000
+
 
 def generate_dummy_data(num_records=1000):
     """
@@ -42,42 +45,47 @@ def generate_dummy_data(num_records=1000):
     """
     logger.info(f"Generando {num_records} registros de datos dummy...")
     
-    # Configurar semilla para reproducibilidad
-    np.random.seed(42)
+    # Generador con semilla para reproducibilidad
+    rng = np.random.default_rng(42)
     
-    # Generar fechas
-    start_date = datetime(2023, 1, 1)
-    dates = [start_date + timedelta(days=x) for x in range(num_records)]
+    # Generar fechas: desplazamientos en días sobre la fecha de inicio
+    start_date = np.datetime64('2023-01-01', 'D')
+    day_offsets = rng.integers(0, num_records, size=num_records)
+    fechas = start_date + day_offsets.astype('timedelta64[D]')
     
     # Productos y categorías
-    products = ['Laptop', 'Mouse', 'Teclado', 'Monitor', 'Webcam', 
-                'Auriculares', 'Tablet', 'Smartphone', 'Impresora', 'Router']
-    categories = ['Electrónica', 'Accesorios', 'Computadoras', 'Redes']
-    regions = ['Norte', 'Sur', 'Este', 'Oeste', 'Centro']
+    products = np.array(['Laptop', 'Mouse', 'Teclado', 'Monitor', 'Webcam', 
+                         'Auriculares', 'Tablet', 'Smartphone', 'Impresora', 'Router'])
+    categories = np.array(['Electrónica', 'Accesorios', 'Computadoras', 'Redes'])
+    regions = np.array(['Norte', 'Sur', 'Este', 'Oeste', 'Centro'])
     
-    # Generar datos
-    data = {
-        'id': range(1, num_records + 1),
-        'fecha': np.random.choice(dates, num_records),
-        'producto': np.random.choice(products, num_records),
-        'categoria': np.random.choice(categories, num_records),
-        'region': np.random.choice(regions, num_records),
-        'cantidad': np.random.randint(1, 50, num_records),
-        'precio_unitario': np.round(np.random.uniform(10.0, 1500.0, num_records), 2),
-        'descuento': np.round(np.random.uniform(0.0, 0.3, num_records), 2),
-        'cliente_id': np.random.randint(1000, 9999, num_records),
-        'vendedor_id': np.random.randint(1, 50, num_records)
-    }
-    
-    df = pd.DataFrame(data)
+    # Generar columnas como arrays de NumPy
+    cantidad = rng.integers(1, 50, num_records)
+    precio_unitario = np.round(rng.uniform(10.0, 1500.0, num_records), 2)
+    descuento = np.round(rng.uniform(0.0, 0.3, num_records), 2)
     
     # Calcular total de venta
-    df['total_venta'] = df['cantidad'] * df['precio_unitario'] * (1 - df['descuento'])
-    df['total_venta'] = df['total_venta'].round(2)
+    total_venta = np.round(cantidad * precio_unitario * (1 - descuento), 2)
     
     # Agregar algunos valores nulos para demostrar limpieza de datos
-    null_indices = np.random.choice(df.index, size=int(num_records * 0.02), replace=False)
-    df.loc[null_indices, 'descuento'] = np.nan
+    null_indices = rng.choice(num_records, size=int(num_records * 0.02), replace=False)
+    descuento[null_indices] = np.nan
+    
+    data = {
+        'id': np.arange(1, num_records + 1),
+        'fecha': fechas,
+        'producto': products[rng.integers(0, len(products), num_records)],
+        'categoria': categories[rng.integers(0, len(categories), num_records)],
+        'region': regions[rng.integers(0, len(regions), num_records)],
+        'cantidad': cantidad,
+        'precio_unitario': precio_unitario,
+        'descuento': descuento,
+        'cliente_id': rng.integers(1000, 9999, num_records),
+        'vendedor_id': rng.integers(1, 50, num_records),
+        'total_venta': total_venta
+    }
+    
+    df = pd.DataFrame(data)
     
     logger.info(f"Datos generados exitosamente: {df.shape}")
     return df
@@ -125,11 +133,11 @@ def create_database_tables():
     """
     
     try:
-        db_config.execute_query(create_source_table)
+        db_config.execute_script([create_source_table, create_target_table])
         logger.info(f"Tabla '{db_config.table_source}' creada exitosamente")
-        
-        db_config.execute_query(create_target_table)
         logger.info(f"Tabla '{db_config.table_target}' creada exitosamente")
+        
+        db_config.invalidate_schema_cache()
     except Exception as e:
         logger.error(f"Error creando tablas: {e}")
         raise
@@ -144,26 +152,36 @@ def insert_dummy_data(df):
     """
     logger.info("Insertando datos en la base de datos...")
     
-    conn = db_config.get_connection()
-    
-    try:
-        # Convertir fecha a string para SQLite
-        df['fecha'] = df['fecha'].astype(str)
-        
-        # Insertar datos
-        df.to_sql(
-            db_config.table_source,
-            conn,
-            if_exists='replace',
-            index=False
-        )
-        
-        logger.info(f"{len(df)} registros insertados en '{db_config.table_source}'")
-    except Exception as e:
-        logger.error(f"Error insertando datos: {e}")
-        raise
-    finally:
-        db_config.close_connection(conn)
+    with db_config.bulk_connection() as conn:
+        try:
+            # Convertir fecha a string para SQLite (vectorizado en NumPy)
+            df['fecha'] = np.datetime_as_string(
+                df['fecha'].to_numpy(dtype='datetime64[D]'), unit='D'
+            )
+            
+            if db_config.table_exists(db_config.table_source):
+                # Reemplazar el contenido conservando el esquema declarado: el
+                # DELETE y las sentencias multi-fila van en una sola transacción,
+                # así un fallo al insertar no deja la tabla vacía
+                db_config.insert_dataframe(
+                    df,
+                    db_config.table_source,
+                    pre_sql=[f"DELETE FROM {db_config.table_source}"]
+                )
+            else:
+                # Sin tabla previa, pandas crea el esquema a partir del DataFrame
+                df.to_sql(
+                    db_config.table_source,
+                    conn,
+                    if_exists='replace',
+                    index=False
+                )
+                db_config.register_table(db_config.table_source)
+            
+            logger.info(f"{len(df)} registros insertados en '{db_config.table_source}'")
+        except Exception as e:
+            logger.error(f"Error insertando datos: {e}")
+            raise
 
 
 def save_sample_csv(df, output_path=None):
@@ -180,8 +198,9 @@ def save_sample_csv(df, output_path=None):
     # Crear directorio si no existe
     Path(output_path).mkdir(parents=True, exist_ok=True)
     
-    csv_path = os.path.join(output_path, 'dummy_data.csv')
-    df.to_csv(csv_path, index=False)
+    # Escritura por bloques y comprimida: no se arma todo el texto en memoria
+    csv_path = os.path.join(output_path, 'dummy_data.csv.gz')
+    df.to_csv(csv_path, index=False, chunksize=CSV_CHUNK_SIZE, compression='gzip')
     logger.info(f"Datos de muestra guardados en: {csv_path}")
 
 
@@ -200,18 +219,17 @@ def main():
         # 2. Crear tablas
         create_database_tables()
         
-        # 3. Insertar datos
-        insert_dummy_data(df)
-        
-        # 4. Guardar CSV de muestra
-        save_sample_csv(df)
+        # 3-4. Insertar datos y guardar CSV de muestra en paralelo (E/S independientes).
+        # El CSV recibe una copia superficial: insert_dummy_data reemplaza la
+        # columna 'fecha' del original sin tocar los arrays compartidos
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            csv_future = executor.submit(save_sample_csv, df.copy(deep=False))
+            insert_dummy_data(df)
+            csv_future.result()
         
         # 5. Verificar datos insertados
-        conn = db_config.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {db_config.table_source}")
-        count = cursor.fetchone()[0]
-        db_config.close_connection(conn)
+        with db_config.session() as conn:
+            count = conn.execute(f"SELECT COUNT(*) FROM {db_config.table_source}").fetchone()[0]
         
         logger.info("=" * 60)
         logger.info(f"✓ Base de datos creada exitosamente")
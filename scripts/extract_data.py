@@ -28,6 +28,9 @@ logger = logging.getLogger(__name__)
 # Cargar variables de entorno
 load_dotenv()
 
+# Filas leídas por bloque en la extracción
+EXTRACT_CHUNK_SIZE = 50_000
+
 
 def extract_data_from_db(table_name=None, date_filter=None, limit=None):
     """
@@ -46,28 +49,34 @@ def extract_data_from_db(table_name=None, date_filter=None, limit=None):
     
     logger.info(f"Iniciando extracción de datos desde tabla: {table_name}")
     
-    # Construir query SQL
-    query = f"SELECT * FROM {table_name}"
+    # Construir query SQL con lista explícita de columnas (esquema en caché)
+    columns = [col[1] for col in db_config.get_table_info(table_name)]
+    column_list = ', '.join(f'"{col}"' for col in columns) if columns else '*'
+    query = f"SELECT {column_list} FROM {table_name}"
+    params = []
     
-    # Agregar filtros si existen
+    # Agregar filtros si existen (como parámetros enlazados)
     conditions = []
     if date_filter:
-        conditions.append(f"fecha >= '{date_filter}'")
+        conditions.append("fecha >= ?")
+        params.append(date_filter)
     
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
     
     # Agregar límite si existe
     if limit:
-        query += f" LIMIT {limit}"
+        query += " LIMIT ?"
+        params.append(int(limit))
     
-    logger.info(f"Ejecutando query: {query}")
+    logger.info(f"Ejecutando query: {query} {params}")
     
     try:
-        # Conectar y extraer datos
-        conn = db_config.get_connection()
-        df = pd.read_sql_query(query, conn)
-        db_config.close_connection(conn)
+        # Extraer datos con una conexión de solo lectura del pool, por bloques
+        # para no materializar todas las filas como tuplas de Python a la vez
+        with db_config.reader() as conn:
+            chunks = pd.read_sql_query(query, conn, params=params, chunksize=EXTRACT_CHUNK_SIZE)
+            df = pd.concat(chunks, ignore_index=True, copy=False)
         
         logger.info(f"✓ Datos extraídos exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas")
         
@@ -117,7 +126,9 @@ def validate_extracted_data(df):
     
     # 3. Verificar tipos de datos básicos
     try:
-        df['fecha'] = pd.to_datetime(df['fecha'])
+        # Se convierte una sola vez; las etapas siguientes reciben datetime64
+        if not pd.api.types.is_datetime64_any_dtype(df['fecha']):
+            df['fecha'] = pd.to_datetime(df['fecha'], format='ISO8601', cache=True)
         logger.info("✓ Columna 'fecha' convertida a datetime")
         validations.append(True)
     except Exception as e:
@@ -126,21 +137,22 @@ def validate_extracted_data(df):
     
     # 4. Verificar valores numéricos
     numeric_columns = ['cantidad', 'precio_unitario', 'total_venta']
-    for col in numeric_columns:
-        if col in df.columns:
-            if not pd.api.types.is_numeric_dtype(df[col]):
-                logger.warning(f"⚠ Columna '{col}' no es numérica, intentando conversión...")
-                try:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    validations.append(True)
-                except:
-                    validations.append(False)
+    present = df.columns.intersection(numeric_columns)
+    non_numeric = df[present].select_dtypes(exclude='number').columns.tolist()
+    if non_numeric:
+        logger.warning(f"⚠ Columnas no numéricas {non_numeric}, intentando conversión...")
+        try:
+            df[non_numeric] = df[non_numeric].apply(pd.to_numeric, errors='coerce')
+            validations.append(True)
+        except Exception:
+            validations.append(False)
     
-    # 5. Reportar valores nulos
+    # 5. Reportar valores nulos (un solo recuento por columna)
     null_counts = df.isnull().sum()
-    if null_counts.sum() > 0:
+    null_counts = null_counts[null_counts > 0]
+    if not null_counts.empty:
         logger.warning("⚠ Valores nulos encontrados:")
-        for col, count in null_counts[null_counts > 0].items():
+        for col, count in null_counts.items():
             logger.warning(f"  - {col}: {count} valores nulos ({count/len(df)*100:.2f}%)")
     else:
         logger.info("✓ No se encontraron valores nulos")
@@ -155,13 +167,16 @@ def validate_extracted_data(df):
     return is_valid
 
 
-def save_extracted_data(df, output_path=None, filename='extracted_data.csv'):
+def save_extracted_data(df, output_path=None, filename='extracted_data.parquet'):
     """
-    Guarda los datos extraídos en un archivo CSV temporal.
+    Guarda los datos extraídos en un archivo temporal.
+    
+    El formato se elige según la extensión: `.parquet` (columnar, con tipos)
+    o `.csv`.
     
     Args:
         df (pd.DataFrame): DataFrame a guardar
-        output_path (str, optional): Ruta donde guardar el archivo
+        output_path (str | os.PathLike, optional): Ruta donde guardar el archivo
         filename (str): Nombre del archivo
     """
     if output_path is None:
@@ -174,7 +189,11 @@ def save_extracted_data(df, output_path=None, filename='extracted_data.csv'):
     file_path = os.path.join(output_path, filename)
     
     try:
-        df.to_csv(file_path, index=False)
+        if file_path.endswith('.parquet'):
+            df.to_parquet(file_path, engine='pyarrow', compression='snappy', index=False)
+        else:
+            # Por bloques; la compresión se deduce de la extensión (.csv.gz)
+            df.to_csv(file_path, index=False, chunksize=EXTRACT_CHUNK_SIZE)
         logger.info(f"✓ Datos extraídos guardados en: {file_path}")
         logger.info(f"  Tamaño del archivo: {os.path.getsize(file_path) / 1024:.2f} KB")
     except Exception as e:
@@ -241,7 +260,7 @@ def extract(**kwargs):
         
         # 3. Guardar datos extraídos
         output_path = os.getenv('DATA_OUTPUT_PATH', 'data/output')
-        filename = 'extracted_data.csv'
+        filename = 'extracted_data.parquet'
         save_extracted_data(df, output_path, filename)
         
         # 4. Generar resumen
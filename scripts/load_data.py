@@ -4,6 +4,7 @@ Carga los datos transformados en la tabla destino de la base de datos.
 """
 
 import pandas as pd
+import numpy as np
 import sqlite3
 import os
 import sys
@@ -28,10 +29,13 @@ logger = logging.getLogger(__name__)
 # Cargar variables de entorno
 load_dotenv()
 
+# Columnas indexadas en la tabla destino (se crean después de la carga)
+INDEXED_COLUMNS = ['fecha', 'producto', 'categoria', 'region']
+
 
 def load_transformed_data(file_path=None):
     """
-    Carga los datos transformados desde un archivo CSV.
+    Carga los datos transformados desde un archivo Parquet o CSV.
     
     Args:
         file_path (str, optional): Ruta del archivo a cargar
@@ -41,12 +45,15 @@ def load_transformed_data(file_path=None):
     """
     if file_path is None:
         output_path = os.getenv('DATA_OUTPUT_PATH', 'data/output')
-        file_path = os.path.join(output_path, 'transformed_data.csv')
+        file_path = os.path.join(output_path, 'transformed_data.parquet')
     
     logger.info(f"Cargando datos transformados desde: {file_path}")
     
     try:
-        df = pd.read_csv(file_path)
+        if str(file_path).endswith('.parquet'):
+            df = pd.read_parquet(file_path, engine='pyarrow')
+        else:
+            df = pd.read_csv(file_path)
         logger.info(f"✓ Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
         return df
     except Exception as e:
@@ -89,7 +96,7 @@ def validate_data_before_load(df):
         validations.append(True)
     
     # 3. Verificar valores nulos en columnas críticas
-    critical_columns = ['fecha', 'producto', 'total_venta']
+    critical_columns = df.columns.intersection(['fecha', 'producto', 'total_venta'])
     null_counts = df[critical_columns].isnull().sum()
     
     if null_counts.sum() > 0:
@@ -100,17 +107,20 @@ def validate_data_before_load(df):
         validations.append(True)
     
     # 4. Verificar valores numéricos válidos
-    numeric_columns = ['cantidad_total', 'precio_promedio', 'total_venta', 'num_transacciones']
-    for col in numeric_columns:
-        if col in df.columns:
-            if (df[col] < 0).any():
-                logger.error(f"❌ Valores negativos encontrados en '{col}'")
-                validations.append(False)
-            else:
-                validations.append(True)
+    numeric_columns = df.columns.intersection(
+        ['cantidad_total', 'precio_promedio', 'total_venta', 'num_transacciones']
+    )
+    negative = (df[numeric_columns] < 0).any()
+    negative_columns = negative[negative].index.tolist()
+    if negative_columns:
+        logger.error(f"❌ Valores negativos encontrados en {negative_columns}")
+        validations.append(False)
+    else:
+        validations.append(True)
     
     # 5. Verificar duplicados
-    duplicates = df.duplicated(subset=['fecha', 'producto', 'categoria', 'region']).sum()
+    key_columns = df.columns.intersection(['fecha', 'producto', 'categoria', 'region'])
+    duplicates = df.duplicated(subset=key_columns).sum() if len(key_columns) else 0
     if duplicates > 0:
         logger.warning(f"⚠ Se encontraron {duplicates} registros duplicados")
         # No es crítico, pero se reporta
@@ -129,52 +139,55 @@ def prepare_data_for_load(df):
     """
     Prepara los datos para la carga en la base de datos.
     
+    El DataFrame se modifica en el lugar para no duplicarlo en memoria;
+    el llamador no debe reutilizar el original.
+    
     Args:
         df (pd.DataFrame): DataFrame a preparar
         
     Returns:
-        pd.DataFrame: DataFrame preparado
+        pd.DataFrame: El mismo DataFrame, preparado
     """
     logger.info("Preparando datos para la carga...")
     
-    df_prepared = df.copy()
-    
     # 1. Convertir fecha a string para SQLite
-    if 'fecha' in df_prepared.columns:
-        df_prepared['fecha'] = pd.to_datetime(df_prepared['fecha']).dt.strftime('%Y-%m-%d')
+    if 'fecha' in df.columns:
+        fechas = df['fecha']
+        if not pd.api.types.is_datetime64_any_dtype(fechas):
+            fechas = pd.to_datetime(fechas, format='ISO8601', cache=True)
+        fechas = fechas.to_numpy(dtype='datetime64[D]')
+        fechas_str = np.datetime_as_string(fechas, unit='D').astype(object)
+        fechas_str[np.isnat(fechas)] = None
+        df['fecha'] = fechas_str
         logger.info("✓ Fechas convertidas a formato string")
     
-    # 2. Asegurar tipos de datos correctos
-    numeric_columns = ['cantidad_total', 'precio_promedio', 'descuento_promedio', 
-                      'total_venta', 'num_transacciones']
-    
-    for col in numeric_columns:
-        if col in df_prepared.columns:
-            df_prepared[col] = pd.to_numeric(df_prepared[col], errors='coerce')
-    
-    logger.info("✓ Tipos de datos verificados")
-    
-    # 3. Eliminar columnas innecesarias si existen
+    # 2. Eliminar columnas innecesarias si existen
     columns_to_drop = ['Unnamed: 0', 'index']
-    df_prepared = df_prepared.drop(columns=[col for col in columns_to_drop if col in df_prepared.columns])
+    df.drop(columns=[col for col in columns_to_drop if col in df.columns], inplace=True)
     
-    # 4. Ordenar por fecha
-    df_prepared = df_prepared.sort_values('fecha')
+    # 3. Ordenar por fecha
+    df.sort_values('fecha', inplace=True, kind='stable')
     logger.info("✓ Datos ordenados por fecha")
     
-    logger.info(f"✓ Datos preparados: {df_prepared.shape}")
+    logger.info(f"✓ Datos preparados: {df.shape}")
     
-    return df_prepared
+    return df
 
 
-def load_to_database(df, table_name=None, if_exists='replace'):
+def load_to_database(df, table_name=None, if_exists='replace', conn=None, drop_indexes=False):
     """
     Carga los datos en la base de datos SQLite.
     
+    Insertar en una tabla sin índices y crearlos después (`create_indexes`)
+    es más rápido que mantenerlos actualizados fila a fila durante la carga.
+    
     Args:
         df (pd.DataFrame): DataFrame a cargar
         table_name (str, optional): Nombre de la tabla destino
         if_exists (str): Acción si la tabla existe ('replace', 'append', 'fail')
+        conn (sqlite3.Connection, optional): Conexión compartida a reutilizar
+        drop_indexes (bool): Si True, elimina los índices de INDEXED_COLUMNS
+            en la misma transacción de la carga
         
     Returns:
         int: Número de registros cargados
@@ -185,43 +198,64 @@ def load_to_database(df, table_name=None, if_exists='replace'):
     logger.info(f"Cargando datos en la tabla: {table_name}")
     logger.info(f"Modo de carga: {if_exists}")
     
-    conn = db_config.get_connection()
-    
-    try:
-        # Cargar datos
-        df.to_sql(
-            table_name,
-            conn,
-            if_exists=if_exists,
-            index=False
-        )
-        
-        records_loaded = len(df)
-        logger.info(f"✓ {records_loaded} registros cargados exitosamente")
-        
-        # Verificar la carga
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        total_records = cursor.fetchone()[0]
-        logger.info(f"✓ Total de registros en la tabla: {total_records}")
-        
-        cursor.close()
-        
-        return records_loaded
-        
-    except Exception as e:
-        logger.error(f"Error cargando datos: {e}")
-        raise
-    finally:
-        db_config.close_connection(conn)
+    with db_config.bulk_connection(conn) as conn:
+        try:
+            # Preparar la tabla según el modo de carga. El vaciado o la
+            # recreación van en la misma transacción que los INSERT, así una
+            # carga fallida se revierte sin dejar la tabla vacía
+            table_exists = db_config.table_exists(table_name)
+            if table_exists and if_exists == 'fail':
+                raise ValueError(f"La tabla '{table_name}' ya existe")
+            pre_sql = []
+            if table_exists and drop_indexes:
+                pre_sql.extend(
+                    f"DROP INDEX IF EXISTS idx_{table_name}_{col}" for col in INDEXED_COLUMNS
+                )
+            if table_exists and if_exists == 'replace':
+                # Vaciar la tabla conserva su esquema declarado y evita el
+                # DROP/CREATE; solo se recrea si le faltan columnas del DataFrame
+                existing_columns = {col[1] for col in db_config.get_table_info(table_name)}
+                if set(df.columns) <= existing_columns:
+                    pre_sql.append(f"DELETE FROM {table_name}")
+                else:
+                    pre_sql.append(f"DROP TABLE {table_name}")
+                    table_exists = False
+            if not table_exists:
+                pre_sql.append(pd.io.sql.get_schema(df, table_name))
+            
+            # Cargar datos en bloques de CHUNK_SIZE filas por sentencia y un solo commit
+            db_config.insert_dataframe(df, table_name, conn=conn, pre_sql=pre_sql)
+            if not table_exists:
+                db_config.register_table(table_name)
+            
+            records_loaded = len(df)
+            logger.info(f"✓ {records_loaded} registros cargados exitosamente")
+            
+            # Verificar la carga
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+            total_records = cursor.fetchone()[0]
+            logger.info(f"✓ Total de registros en la tabla: {total_records}")
+            
+            cursor.close()
+            
+            return records_loaded
+            
+        except Exception as e:
+            logger.error(f"Error cargando datos: {e}")
+            raise
 
 
-def create_indexes(table_name=None):
+def create_indexes(table_name=None, conn=None):
     """
     Crea índices en la tabla para mejorar el rendimiento de consultas.
     
+    Tras crearlos ejecuta ANALYZE para que el planificador disponga de
+    estadísticas actualizadas en las consultas posteriores.
+    
     Args:
         table_name (str, optional): Nombre de la tabla
+        conn (sqlite3.Connection, optional): Conexión compartida a reutilizar
     """
     if table_name is None:
         table_name = db_config.table_target
@@ -229,15 +263,12 @@ def create_indexes(table_name=None):
     logger.info(f"Creando índices en la tabla: {table_name}")
     
     indexes = [
-        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_fecha ON {table_name}(fecha)",
-        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_producto ON {table_name}(producto)",
-        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_categoria ON {table_name}(categoria)",
-        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_region ON {table_name}(region)"
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{col} ON {table_name}({col})"
+        for col in INDEXED_COLUMNS
     ]
     
     try:
-        for index_query in indexes:
-            db_config.execute_query(index_query)
+        db_config.execute_script(indexes + [f"ANALYZE {table_name}"], conn=conn)
         
         logger.info(f"✓ {len(indexes)} índices creados exitosamente")
     except Exception as e:
@@ -245,12 +276,13 @@ def create_indexes(table_name=None):
         # No es crítico, continuar
 
 
-def generate_load_statistics(table_name=None):
+def generate_load_statistics(table_name=None, conn=None):
     """
     Genera estadísticas sobre los datos cargados.
     
     Args:
         table_name (str, optional): Nombre de la tabla
+        conn (sqlite3.Connection, optional): Conexión compartida a reutilizar
         
     Returns:
         dict: Diccionario con las estadísticas
@@ -260,20 +292,15 @@ def generate_load_statistics(table_name=None):
     
     logger.info("Generando estadísticas de carga...")
     
-    conn = db_config.get_connection()
+    conn = conn or db_config.get_connection()
     
     try:
-        # Total de registros
-        query_count = f"SELECT COUNT(*) FROM {table_name}"
-        total_records = pd.read_sql_query(query_count, conn).iloc[0, 0]
-        
-        # Total de ventas
-        query_sales = f"SELECT SUM(total_venta) as total FROM {table_name}"
-        total_sales = pd.read_sql_query(query_sales, conn).iloc[0, 0]
-        
-        # Rango de fechas
-        query_dates = f"SELECT MIN(fecha) as min_date, MAX(fecha) as max_date FROM {table_name}"
-        dates = pd.read_sql_query(query_dates, conn)
+        # Agregados de una sola fila en un único recorrido de la tabla
+        query_summary = f"""
+            SELECT COUNT(*), SUM(total_venta), MIN(fecha), MAX(fecha)
+            FROM {table_name}
+        """
+        total_records, total_sales, min_date, max_date = conn.execute(query_summary).fetchone()
         
         # Top productos
         query_top_products = f"""
@@ -283,7 +310,7 @@ def generate_load_statistics(table_name=None):
             ORDER BY total DESC
             LIMIT 5
         """
-        top_products = pd.read_sql_query(query_top_products, conn)
+        top_products = conn.execute(query_top_products).fetchall()
         
         # Top regiones
         query_top_regions = f"""
@@ -293,17 +320,17 @@ def generate_load_statistics(table_name=None):
             ORDER BY total DESC
             LIMIT 5
         """
-        top_regions = pd.read_sql_query(query_top_regions, conn)
+        top_regions = conn.execute(query_top_regions).fetchall()
         
         statistics = {
             'total_records': int(total_records),
             'total_sales': float(total_sales) if total_sales else 0,
             'date_range': {
-                'min': str(dates.iloc[0, 0]),
-                'max': str(dates.iloc[0, 1])
+                'min': str(min_date),
+                'max': str(max_date)
             },
-            'top_products': top_products.to_dict('records'),
-            'top_regions': top_regions.to_dict('records'),
+            'top_products': [{'producto': p, 'total': t} for p, t in top_products],
+            'top_regions': [{'region': r, 'total': t} for r, t in top_regions],
             'load_timestamp': datetime.now().isoformat()
         }
         
@@ -326,16 +353,15 @@ def generate_load_statistics(table_name=None):
     except Exception as e:
         logger.error(f"Error generando estadísticas: {e}")
         raise
-    finally:
-        db_config.close_connection(conn)
 
 
-def backup_existing_data(table_name=None):
+def backup_existing_data(table_name=None, conn=None):
     """
     Crea un backup de los datos existentes antes de cargar nuevos datos.
     
     Args:
         table_name (str, optional): Nombre de la tabla
+        conn (sqlite3.Connection, optional): Conexión compartida a reutilizar
     """
     if table_name is None:
         table_name = db_config.table_target
@@ -352,19 +378,24 @@ def backup_existing_data(table_name=None):
     query = f"CREATE TABLE {backup_table} AS SELECT * FROM {table_name}"
     
     try:
-        db_config.execute_query(query)
+        with db_config.bulk_connection(conn) as bulk_conn:
+            bulk_conn.execute(query)
+        db_config.register_table(backup_table)
         logger.info(f"✓ Backup creado exitosamente: {backup_table}")
     except Exception as e:
         logger.warning(f"⚠ No se pudo crear backup: {e}")
         # No es crítico, continuar
 
 
-def load(**kwargs):
+def load(input_path=None, **kwargs):
     """
     Función principal de carga para ser llamada por Airflow.
     
     Args:
-        **kwargs: Argumentos de contexto de Airflow
+        input_path (str, optional): Ruta de los datos transformados
+        **kwargs: Argumentos de contexto de Airflow. Si no se indica
+            `input_path` e incluye `ti`, la ruta se toma del XCom de la
+            tarea `transform_data`.
         
     Returns:
         dict: Estadísticas de la carga
@@ -373,9 +404,15 @@ def load(**kwargs):
     logger.info("INICIANDO PROCESO DE CARGA (LOAD)")
     logger.info("=" * 60)
     
+    # Una sola conexión para backup, carga, índices y estadísticas
+    conn = db_config.get_connection()
+    
     try:
-        # 1. Cargar datos transformados
-        df = load_transformed_data()
+        # 1. Cargar datos transformados (ruta recibida por XCom si existe)
+        ti = kwargs.get('ti')
+        if input_path is None and ti:
+            input_path = ti.xcom_pull(task_ids='transform_data')
+        df = load_transformed_data(input_path)
         
         # 2. Validar datos
         if not validate_data_before_load(df):
@@ -385,16 +422,18 @@ def load(**kwargs):
         df_prepared = prepare_data_for_load(df)
         
         # 4. Crear backup (opcional)
-        backup_existing_data()
+        backup_existing_data(conn=conn)
         
-        # 5. Cargar datos en la base de datos
-        records_loaded = load_to_database(df_prepared, if_exists='replace')
+        # 5. Cargar datos en la base de datos (sin índices durante la carga)
+        records_loaded = load_to_database(
+            df_prepared, if_exists='replace', conn=conn, drop_indexes=True
+        )
         
         # 6. Crear índices
-        create_indexes()
+        create_indexes(conn=conn)
         
         # 7. Generar estadísticas
-        statistics = generate_load_statistics()
+        statistics = generate_load_statistics(conn=conn)
         
         logger.info("=" * 60)
         logger.info("✓ CARGA COMPLETADA EXITOSAMENTE")
@@ -406,6 +445,8 @@ def load(**kwargs):
     except Exception as e:
         logger.error(f"❌ Error en el proceso de carga: {e}")
         raise
+    finally:
+        db_config.close()
 
 
 if __name__ == "__main__":
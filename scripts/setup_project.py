@@ -5,7 +5,12 @@ Ejecuta todos los pasos necesarios para inicializar el proyecto.
 
 import os
 import sys
+import json
+import sqlite3
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import closing
 from pathlib import Path
 import logging
 
@@ -16,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Serializa la cabecera de cada paso para que no se intercale entre hilos
+_log_lock = threading.Lock()
+
 
 def print_banner():
     """Imprime el banner del proyecto."""
@@ -55,9 +63,13 @@ def create_directories():
         'logs'
     ]
     
+    # Los directorios comparten padres (data/, airflow/): se crean una vez y
+    # cada hoja queda a un único mkdir, sin recorrer de nuevo la ruta
+    for parent in sorted({Path(d).parent for d in directories} - {Path('.')}):
+        parent.mkdir(parents=True, exist_ok=True)
+    
     for directory in directories:
-        path = Path(directory)
-        path.mkdir(parents=True, exist_ok=True)
+        Path(directory).mkdir(exist_ok=True)
         logger.info(f"✓ Directorio creado: {directory}")
     
     return True
@@ -68,19 +80,18 @@ def install_dependencies():
     logger.info("Instalando dependencias...")
     
     try:
+        # Una sola invocación de pip actualiza pip e instala los requisitos
         subprocess.run(
-            [sys.executable, "-m", "pip", "install", "--upgrade", "pip"],
-            check=True,
-            capture_output=True
-        )
-        logger.info("✓ pip actualizado")
-        
-        subprocess.run(
-            [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+            [
+                sys.executable, "-m", "pip", "install",
+                "--no-input", "--disable-pip-version-check",
+                "--upgrade", "pip",
+                "-r", "requirements.txt"
+            ],
             check=True,
             capture_output=True
         )
-        logger.info("✓ Dependencias instaladas")
+        logger.info("✓ pip actualizado y dependencias instaladas")
         return True
     except subprocess.CalledProcessError as e:
         logger.error(f"❌ Error instalando dependencias: {e}")
@@ -123,6 +134,50 @@ def create_dummy_database():
         return False
 
 
+def admin_user_exists(airflow_home, username='admin'):
+    """
+    Comprueba si el usuario ya existe en la base de metadatos de Airflow.
+    
+    Con el backend SQLite se consulta la tabla ab_user directamente, sin
+    arrancar la CLI de Airflow; con otro backend se usa
+    `airflow users list --output json`.
+    
+    Args:
+        airflow_home (Path): Directorio AIRFLOW_HOME
+        username (str): Usuario a buscar
+        
+    Returns:
+        bool: True si el usuario existe
+    """
+    sql_conn = os.environ.get(
+        'AIRFLOW__DATABASE__SQL_ALCHEMY_CONN',
+        f"sqlite:///{airflow_home / 'airflow.db'}"
+    )
+    
+    if sql_conn.startswith('sqlite:///'):
+        db_file = sql_conn[len('sqlite:///'):]
+        try:
+            with closing(sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)) as conn:
+                row = conn.execute(
+                    "SELECT 1 FROM ab_user WHERE username = ?", (username,)
+                ).fetchone()
+            return row is not None
+        except sqlite3.Error:
+            return False
+    
+    try:
+        result = subprocess.run(
+            ["airflow", "users", "list", "--output", "json"],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=os.environ
+        )
+        return any(user.get('username') == username for user in json.loads(result.stdout))
+    except (subprocess.CalledProcessError, ValueError):
+        return False
+
+
 def initialize_airflow():
     """Inicializa la base de datos de Airflow."""
     logger.info("Inicializando Airflow...")
@@ -141,7 +196,11 @@ def initialize_airflow():
         )
         logger.info("✓ Base de datos de Airflow inicializada")
         
-        # Crear usuario admin
+        # Crear usuario admin (se omite si ya existe de una ejecución anterior)
+        if admin_user_exists(airflow_home):
+            logger.info("✓ Usuario admin ya existe (usuario: admin)")
+            return True
+        
         subprocess.run(
             [
                 "airflow", "users", "create",
@@ -208,35 +267,95 @@ def print_next_steps():
     print(next_steps)
 
 
+def _run_step(step_name, step_func):
+    """
+    Ejecuta un paso de configuración registrando su cabecera.
+    
+    Args:
+        step_name: Nombre descriptivo del paso
+        step_func: Función del paso; debe retornar True si tuvo éxito
+        
+    Returns:
+        bool: True si el paso terminó correctamente
+    """
+    with _log_lock:
+        logger.info(f"\n📌 Paso: {step_name}")
+        logger.info("-" * 60)
+    
+    try:
+        success = step_func()
+    except Exception as e:
+        logger.error(f"❌ Error en {step_name}: {e}")
+        return False
+    
+    if not success:
+        logger.error(f"❌ Falló el paso: {step_name}")
+    return bool(success)
+
+
 def main():
-    """Función principal que ejecuta todos los pasos de configuración."""
+    """
+    Función principal que ejecuta todos los pasos de configuración.
+    
+    Los pasos forman un grafo de dependencias: cada uno se lanza en el
+    pool de hilos en cuanto terminan los pasos de los que depende, de modo
+    que la creación de directorios y del .env se solapa con la instalación
+    de dependencias. La base de datos y Airflow se inicializan en serie,
+    en el orden original. Si un paso falla no se lanzan más pasos.
+    """
     print_banner()
     
-    steps = [
-        ("Verificar Python", check_python_version),
-        ("Crear directorios", create_directories),
-        ("Configurar entorno", setup_environment),
-        ("Instalar dependencias", install_dependencies),
-        ("Crear base de datos", create_dummy_database),
-        ("Inicializar Airflow", initialize_airflow),
-    ]
+    # {nombre: (función, dependencias)}
+    steps = {
+        "Verificar Python": (check_python_version, ()),
+        "Crear directorios": (create_directories, ("Verificar Python",)),
+        "Configurar entorno": (setup_environment, ("Verificar Python",)),
+        "Instalar dependencias": (install_dependencies, ("Verificar Python",)),
+        "Crear base de datos": (
+            create_dummy_database,
+            ("Instalar dependencias", "Crear directorios", "Configurar entorno"),
+        ),
+        # Tras la base de datos: create_dummy_db se ejecuta en el proceso y
+        # no debe solaparse con el cambio de AIRFLOW_HOME ni mezclar su salida
+        "Inicializar Airflow": (
+            initialize_airflow,
+            ("Configurar entorno", "Crear base de datos"),
+        ),
+    }
     
     logger.info("Iniciando configuración del proyecto...")
     logger.info("=" * 60)
     
-    for step_name, step_func in steps:
-        logger.info(f"\n📌 Paso: {step_name}")
-        logger.info("-" * 60)
-        
-        try:
-            success = step_func()
-            if not success:
-                logger.error(f"❌ Falló el paso: {step_name}")
-                logger.error("Configuración interrumpida. Por favor, revisa los errores.")
-                return False
-        except Exception as e:
-            logger.error(f"❌ Error en {step_name}: {e}")
-            return False
+    done = set()
+    pending = dict(steps)
+    running = {}
+    failed = False
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        while pending or running:
+            if not failed:
+                ready = [
+                    name for name, (_, deps) in pending.items()
+                    if all(dep in done for dep in deps)
+                ]
+                for name in ready:
+                    step_func, _ = pending.pop(name)
+                    running[executor.submit(_run_step, name, step_func)] = name
+            
+            if not running:
+                break
+            
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.result():
+                    done.add(name)
+                else:
+                    failed = True
+    
+    if failed or pending:
+        logger.error("Configuración interrumpida. Por favor, revisa los errores.")
+        return False
     
     logger.info("\n" + "=" * 60)
     print_next_steps()
@@ -9,13 +9,14 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
 import logging
 
 # Agregar el directorio raíz al path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from config.env_config import env  # noqa: E402
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,13 +24,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Cargar variables de entorno
-load_dotenv()
+# Tipos explícitos para la lectura de CSV (evita la inferencia por escaneo)
+CSV_DTYPES = {
+    'id': 'int64',
+    'precio_unitario': 'float64',
+    'descuento': 'float64',
+    'total_venta': 'float64',
+}
+
+# Nombres de día en el orden de dayofweek (lunes = 0), como day_name()
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Componentes de fecha que transform_data guarda con enteros pequeños
+DATE_PART_COLUMNS = ['año', 'mes', 'dia', 'dia_semana', 'trimestre']
 
 
 def load_extracted_data(file_path=None):
     """
-    Carga los datos extraídos desde un archivo CSV.
+    Carga los datos extraídos desde un archivo Parquet o CSV.
     
     Args:
         file_path (str, optional): Ruta del archivo a cargar
@@ -38,13 +50,28 @@ def load_extracted_data(file_path=None):
         pd.DataFrame: DataFrame con los datos cargados
     """
     if file_path is None:
-        output_path = os.getenv('DATA_OUTPUT_PATH', 'data/output')
-        file_path = os.path.join(output_path, 'extracted_data.csv')
+        output_path = env('DATA_OUTPUT_PATH', 'data/output')
+        file_path = os.path.join(output_path, 'extracted_data.parquet')
     
     logger.info(f"Cargando datos desde: {file_path}")
     
     try:
-        df = pd.read_csv(file_path)
+        if str(file_path).endswith('.parquet'):
+            df = pd.read_parquet(file_path, engine='pyarrow', memory_map=True)
+        else:
+            # El motor pyarrow parsea en paralelo y convierte 'fecha' en la lectura
+            df = pd.read_csv(
+                file_path,
+                engine='pyarrow',
+                dtype=CSV_DTYPES,
+                parse_dates=['fecha'],
+            )
+        
+        # Reducir los enteros al tipo más pequeño que contiene sus valores
+        # (sin pérdida); los importes se mantienen en float64
+        for col in df.select_dtypes(include='integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
         logger.info(f"✓ Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
         return df
     except Exception as e:
@@ -52,10 +79,63 @@ def load_extracted_data(file_path=None):
         raise
 
 
+def _quartiles(values):
+    """
+    Calcula Q1 y Q3 con np.partition en una sola pasada O(n).
+    
+    Reproduce la interpolación lineal de Series.quantile sin ordenar el
+    array completo; los NaN se ignoran.
+    
+    Args:
+        values (np.ndarray): Valores numéricos
+        
+    Returns:
+        tuple: (Q1, Q3); NaN si no hay valores
+    """
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return np.nan, np.nan
+    
+    positions = (n - 1) * np.array([0.25, 0.75])
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, n - 1)
+    part = np.partition(values, np.unique(np.concatenate([lower, upper])))
+    Q1, Q3 = part[lower] + (part[upper] - part[lower]) * (positions - lower)
+    return Q1, Q3
+
+
+def _normalize_text(series):
+    """
+    Aplica strip() y title() sobre los valores únicos de una columna.
+    
+    Las columnas de texto tienen muy pocos valores distintos, así que se
+    normaliza el diccionario y se reconstruye la columna como Categorical
+    (categorías ordenadas) a partir de los códigos.
+    
+    Args:
+        series (pd.Series): Columna de texto
+        
+    Returns:
+        pd.Categorical: Columna normalizada
+    """
+    codes, uniques = pd.factorize(series)
+    normalized = pd.Index(uniques).str.strip().str.title()
+    # Valores que coinciden tras normalizar comparten categoría
+    new_codes, categories = pd.factorize(normalized, sort=True)
+    codes = np.where(codes >= 0, new_codes[codes], -1)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
 def clean_data(df):
     """
     Limpia los datos: maneja valores nulos, duplicados y outliers.
     
+    No copia los datos de la entrada: la conversión de 'fecha', el relleno
+    de 'descuento' y la normalización de texto modifican `df` en el sitio.
+    Siempre se retorna un DataFrame nuevo (el subconjunto filtrado o una
+    copia superficial), de modo que añadirle columnas no altera `df`.
+    
     Args:
         df (pd.DataFrame): DataFrame a limpiar
         
@@ -64,17 +144,21 @@ def clean_data(df):
     """
     logger.info("Iniciando limpieza de datos...")
     
-    df_clean = df.copy()
+    df_clean = df
     initial_rows = len(df_clean)
     
     # 1. Convertir fecha a datetime
-    df_clean['fecha'] = pd.to_datetime(df_clean['fecha'])
+    if not pd.api.types.is_datetime64_any_dtype(df_clean['fecha']):
+        df_clean['fecha'] = pd.to_datetime(df_clean['fecha'], format='ISO8601', cache=True)
     logger.info("✓ Fechas convertidas a datetime")
     
+    # Las condiciones de filtrado se acumulan en una única máscara booleana
+    # (ndarray, sin alineación de índices) y el DataFrame se reconstruye una
+    # sola vez al final.
     # 2. Eliminar duplicados completos
-    duplicates = df_clean.duplicated().sum()
+    keep = ~df_clean.duplicated().to_numpy()
+    duplicates = len(df_clean) - int(keep.sum())
     if duplicates > 0:
-        df_clean = df_clean.drop_duplicates()
         logger.info(f"✓ Eliminados {duplicates} registros duplicados")
     
     # 3. Manejar valores nulos
@@ -87,50 +171,58 @@ def clean_data(df):
     
     # Eliminar filas con valores nulos en columnas críticas
     critical_columns = ['fecha', 'producto', 'cantidad', 'precio_unitario']
-    null_critical = df_clean[critical_columns].isnull().any(axis=1).sum()
+    has_nulls = df_clean[critical_columns].isnull().any(axis=1).to_numpy()
+    null_critical = int((keep & has_nulls).sum())
+    keep &= ~has_nulls
     if null_critical > 0:
-        df_clean = df_clean.dropna(subset=critical_columns)
         logger.info(f"✓ Eliminadas {null_critical} filas con valores nulos en columnas críticas")
     
     # 4. Validar y limpiar valores numéricos
     # Eliminar cantidades negativas o cero
-    invalid_qty = (df_clean['cantidad'] <= 0).sum()
+    valid_qty = np.greater(df_clean['cantidad'].to_numpy(), 0)
+    invalid_qty = int((keep & ~valid_qty).sum())
+    keep &= valid_qty
     if invalid_qty > 0:
-        df_clean = df_clean[df_clean['cantidad'] > 0]
         logger.info(f"✓ Eliminadas {invalid_qty} filas con cantidad <= 0")
     
     # Eliminar precios negativos o cero
-    invalid_price = (df_clean['precio_unitario'] <= 0).sum()
+    valid_price = np.greater(df_clean['precio_unitario'].to_numpy(), 0)
+    invalid_price = int((keep & ~valid_price).sum())
+    keep &= valid_price
     if invalid_price > 0:
-        df_clean = df_clean[df_clean['precio_unitario'] > 0]
         logger.info(f"✓ Eliminadas {invalid_price} filas con precio <= 0")
     
     # 5. Detectar y manejar outliers usando IQR
-    def remove_outliers(df, column):
-        Q1 = df[column].quantile(0.25)
-        Q3 = df[column].quantile(0.75)
+    # Los cuartiles se calculan sólo sobre las filas que superan los filtros anteriores
+    if 'total_venta' in df_clean.columns:
+        total = df_clean['total_venta'].to_numpy()
+        Q1, Q3 = _quartiles(total[keep])
         IQR = Q3 - Q1
         lower_bound = Q1 - 3 * IQR
         upper_bound = Q3 + 3 * IQR
         
-        outliers = ((df[column] < lower_bound) | (df[column] > upper_bound)).sum()
-        df_filtered = df[(df[column] >= lower_bound) & (df[column] <= upper_bound)]
-        
-        return df_filtered, outliers
-    
-    # Remover outliers en total_venta
-    if 'total_venta' in df_clean.columns:
-        df_clean, outliers_removed = remove_outliers(df_clean, 'total_venta')
-        if outliers_removed > 0:
-            logger.info(f"✓ Eliminados {outliers_removed} outliers en 'total_venta'")
+        in_range = np.greater_equal(total, lower_bound) & np.less_equal(total, upper_bound)
+        outliers = int((keep & (np.less(total, lower_bound) | np.greater(total, upper_bound))).sum())
+        keep &= in_range
+        if outliers > 0:
+            logger.info(f"✓ Eliminados {outliers} outliers en 'total_venta'")
     
     # 6. Normalizar texto
     text_columns = ['producto', 'categoria', 'region']
     for col in text_columns:
         if col in df_clean.columns:
-            df_clean[col] = df_clean[col].str.strip().str.title()
+            df_clean[col] = _normalize_text(df_clean[col])
     logger.info("✓ Texto normalizado en columnas de categoría")
     
+    # Aplicar la máscara acumulada una única vez. take() devuelve un
+    # DataFrame independiente, así transform_data puede añadir columnas
+    # sin SettingWithCopyWarning; sin filas descartadas basta una copia
+    # superficial para no añadirlas sobre el DataFrame de entrada.
+    if keep.all():
+        df_clean = df_clean.copy(deep=False)
+    else:
+        df_clean = df_clean.take(np.flatnonzero(keep))
+    
     final_rows = len(df_clean)
     rows_removed = initial_rows - final_rows
     
@@ -148,23 +240,32 @@ def transform_data(df):
     """
     Transforma los datos: crea nuevas columnas y agrega información.
     
+    Las columnas nuevas se añaden en el sitio sobre `df`, sin copiarlo.
+    
     Args:
         df (pd.DataFrame): DataFrame a transformar
         
     Returns:
-        pd.DataFrame: DataFrame transformado
+        pd.DataFrame: El mismo DataFrame con las columnas derivadas
     """
     logger.info("Iniciando transformación de datos...")
     
-    df_transformed = df.copy()
+    df_transformed = df
     
     # 1. Extraer componentes de fecha
-    df_transformed['año'] = df_transformed['fecha'].dt.year
-    df_transformed['mes'] = df_transformed['fecha'].dt.month
-    df_transformed['dia'] = df_transformed['fecha'].dt.day
-    df_transformed['dia_semana'] = df_transformed['fecha'].dt.dayofweek
-    df_transformed['nombre_dia'] = df_transformed['fecha'].dt.day_name()
-    df_transformed['trimestre'] = df_transformed['fecha'].dt.quarter
+    # Un único DatetimeIndex reutiliza los campos ya calculados sobre 'fecha'.
+    # Con fechas nulas (NaT) se usan enteros nullable para conservar los NA.
+    idx = pd.DatetimeIndex(df_transformed['fecha'])
+    int16, int8 = ('Int16', 'Int8') if idx.hasnans else ('int16', 'int8')
+    df_transformed['año'] = idx.year.astype(int16)
+    df_transformed['mes'] = idx.month.astype(int8)
+    df_transformed['dia'] = idx.day.astype(int8)
+    dia_semana = idx.dayofweek.astype(int8)
+    df_transformed['dia_semana'] = dia_semana
+    df_transformed['nombre_dia'] = pd.Categorical.from_codes(
+        dia_semana.fillna(-1).astype('int8'), categories=DAY_NAMES
+    )
+    df_transformed['trimestre'] = idx.quarter.astype(int8)
     logger.info("✓ Componentes de fecha extraídos")
     
     # 2. Calcular métricas derivadas
@@ -173,23 +274,20 @@ def transform_data(df):
     df_transformed['margen'] = df_transformed['total_venta'] - (df_transformed['ingreso_bruto'] * 0.6)  # Asumiendo 40% de margen
     logger.info("✓ Métricas derivadas calculadas")
     
-    # 3. Categorizar ventas
-    def categorize_sale(total):
-        if total < 100:
-            return 'Pequeña'
-        elif total < 500:
-            return 'Mediana'
-        elif total < 1000:
-            return 'Grande'
-        else:
-            return 'Premium'
-    
-    df_transformed['categoria_venta'] = df_transformed['total_venta'].apply(categorize_sale)
+    # 3. Categorizar ventas (< 100 Pequeña, < 500 Mediana, < 1000 Grande, resto Premium)
+    bins = np.array([100, 500, 1000])
+    labels = np.array(['Pequeña', 'Mediana', 'Grande', 'Premium'])
+    codes = np.searchsorted(bins, df_transformed['total_venta'].to_numpy(), side='right')
+    df_transformed['categoria_venta'] = pd.Categorical.from_codes(
+        codes, categories=labels, ordered=True
+    )
     logger.info("✓ Ventas categorizadas")
     
     # 4. Crear flags booleanos
-    df_transformed['tiene_descuento'] = df_transformed['descuento'] > 0
-    df_transformed['venta_alta'] = df_transformed['total_venta'] > df_transformed['total_venta'].median()
+    df_transformed['tiene_descuento'] = np.greater(df_transformed['descuento'].to_numpy(), 0.0)
+    # Mediana (ignorando NaN, como Series.median) y comparación sobre el mismo ndarray
+    total = df_transformed['total_venta'].to_numpy()
+    df_transformed['venta_alta'] = total > np.nanmedian(total)
     logger.info("✓ Flags booleanos creados")
     
     logger.info(f"✓ Transformación completada: {df_transformed.shape[1]} columnas totales")
@@ -209,22 +307,19 @@ def aggregate_data(df):
     """
     logger.info("Iniciando agregación de datos...")
     
-    # Agregar por producto, categoría y región
-    df_aggregated = df.groupby(['fecha', 'producto', 'categoria', 'region']).agg({
-        'cantidad': 'sum',
-        'precio_unitario': 'mean',
-        'descuento': 'mean',
-        'total_venta': 'sum',
-        'id': 'count'  # Número de transacciones
-    }).reset_index()
-    
-    # Renombrar columnas
-    df_aggregated.rename(columns={
-        'cantidad': 'cantidad_total',
-        'precio_unitario': 'precio_promedio',
-        'descuento': 'descuento_promedio',
-        'id': 'num_transacciones'
-    }, inplace=True)
+    # Agregar por producto, categoría y región (agregaciones con nombre, sin rename)
+    # sort=False conserva el orden de aparición de los grupos; load_data
+    # ordena por fecha antes de cargar
+    df_aggregated = df.groupby(
+        ['fecha', 'producto', 'categoria', 'region'],
+        observed=True, sort=False, as_index=False
+    ).agg(
+        cantidad_total=('cantidad', 'sum'),
+        precio_promedio=('precio_unitario', 'mean'),
+        descuento_promedio=('descuento', 'mean'),
+        total_venta=('total_venta', 'sum'),
+        num_transacciones=('id', 'count'),  # Número de transacciones
+    )
     
     # Redondear valores
     df_aggregated['precio_promedio'] = df_aggregated['precio_promedio'].round(2)
@@ -237,9 +332,41 @@ def aggregate_data(df):
     return df_aggregated
 
 
-def save_transformed_data(df, output_path=None, filename='transformed_data.csv'):
+def _output_dtypes(df):
     """
-    Guarda los datos transformados en un archivo CSV.
+    Retorna `df` con los tipos de columna del esquema de salida publicado.
+    
+    Las columnas categóricas vuelven a texto (object), los componentes de
+    fecha a int32 como los producían los accesores `.dt`, el resto de
+    enteros a int64 y los enteros con nulos a float64, para que los lectores
+    de los archivos no vean cambios de esquema por los tipos compactos
+    usados en memoria.
+    
+    Args:
+        df (pd.DataFrame): DataFrame a convertir
+        
+    Returns:
+        pd.DataFrame: DataFrame con los tipos de salida
+    """
+    casts = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            casts[col] = object
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            if series.hasnans:
+                casts[col] = 'float64'
+            else:
+                casts[col] = 'int32' if col in DATE_PART_COLUMNS else 'int64'
+    return df.astype(casts) if casts else df
+
+
+def save_transformed_data(df, output_path=None, filename='transformed_data.parquet'):
+    """
+    Guarda los datos transformados en un archivo.
+    
+    El formato se elige según la extensión: `.parquet` (columnar, con tipos)
+    o `.csv`. Las columnas se escriben con los tipos de `_output_dtypes`.
     
     Args:
         df (pd.DataFrame): DataFrame a guardar
@@ -247,7 +374,7 @@ def save_transformed_data(df, output_path=None, filename='transformed_data.csv')
         filename (str): Nombre del archivo
     """
     if output_path is None:
-        output_path = os.getenv('DATA_OUTPUT_PATH', 'data/output')
+        output_path = env('DATA_OUTPUT_PATH', 'data/output')
     
     # Crear directorio si no existe
     Path(output_path).mkdir(parents=True, exist_ok=True)
@@ -256,7 +383,11 @@ def save_transformed_data(df, output_path=None, filename='transformed_data.csv')
     file_path = os.path.join(output_path, filename)
     
     try:
-        df.to_csv(file_path, index=False)
+        df = _output_dtypes(df)
+        if file_path.endswith('.parquet'):
+            df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
+        else:
+            df.to_csv(file_path, index=False)
         logger.info(f"✓ Datos transformados guardados en: {file_path}")
         logger.info(f"  Tamaño del archivo: {os.path.getsize(file_path) / 1024:.2f} KB")
     except Exception as e:
@@ -299,12 +430,15 @@ def get_transformation_summary(df_original, df_transformed):
     return summary
 
 
-def transform(**kwargs):
+def transform(input_path=None, **kwargs):
     """
     Función principal de transformación para ser llamada por Airflow.
     
     Args:
-        **kwargs: Argumentos de contexto de Airflow
+        input_path (str, optional): Ruta de los datos extraídos
+        **kwargs: Argumentos de contexto de Airflow. Si no se indica
+            `input_path` e incluye `ti`, la ruta se toma del XCom de la
+            tarea `extract_data`.
         
     Returns:
         str: Ruta del archivo con datos transformados
@@ -314,8 +448,11 @@ def transform(**kwargs):
     logger.info("=" * 60)
     
     try:
-        # 1. Cargar datos extraídos
-        df_original = load_extracted_data()
+        # 1. Cargar datos extraídos (ruta recibida por XCom si existe)
+        ti = kwargs.get('ti')
+        if input_path is None and ti:
+            input_path = ti.xcom_pull(task_ids='extract_data')
+        df_original = load_extracted_data(input_path)
         
         # 2. Limpiar datos
         df_clean = clean_data(df_original)
@@ -327,17 +464,17 @@ def transform(**kwargs):
         df_aggregated = aggregate_data(df_clean)
         
         # 5. Guardar datos transformados
-        output_path = os.getenv('DATA_OUTPUT_PATH', 'data/output')
-        save_transformed_data(df_aggregated, output_path, 'transformed_data.csv')
+        output_path = env('DATA_OUTPUT_PATH', 'data/output')
+        save_transformed_data(df_aggregated, output_path, 'transformed_data.parquet')
         
         # También guardar versión completa (sin agregar)
-        save_transformed_data(df_transformed_full, output_path, 'transformed_data_full.csv')
+        save_transformed_data(df_transformed_full, output_path, 'transformed_data_full.parquet')
         
         # 6. Generar resumen
         summary = get_transformation_summary(df_original, df_aggregated)
         
         # 7. Retornar ruta del archivo (para XCom en Airflow)
-        file_path = os.path.join(output_path, 'transformed_data.csv')
+        file_path = os.path.join(output_path, 'transformed_data.parquet')
         
         logger.info("=" * 60)
         logger.info("✓ TRANSFORMACIÓN COMPLETADA EXITOSAMENTE")
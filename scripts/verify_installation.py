@@ -5,8 +5,9 @@ Verifica dependencias, archivos, configuración y conectividad.
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import importlib
+import importlib.util
 import sqlite3
 import logging
 
@@ -17,6 +18,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Agregar el directorio raíz al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Variables de entorno (python-dotenv puede faltar; check_dependencies lo reporta)
+from config.env_config import env  # noqa: E402
+
 
 def print_header(title):
     """Imprime un encabezado formateado."""
@@ -25,6 +33,40 @@ def print_header(title):
     print("=" * 60)
 
 
+class _MessageLog:
+    """
+    Acumula el encabezado y los mensajes de una verificación.
+    
+    Las verificaciones que corren en paralelo no escriben en la salida:
+    registran sus mensajes aquí y el hilo principal los emite con `emit()`
+    en el orden original de las verificaciones.
+    """
+    
+    def __init__(self):
+        self.records = []
+    
+    def header(self, title):
+        self.records.append((None, title))
+    
+    def info(self, message):
+        self.records.append((logging.INFO, message))
+    
+    def warning(self, message):
+        self.records.append((logging.WARNING, message))
+    
+    def error(self, message):
+        self.records.append((logging.ERROR, message))
+    
+    def emit(self):
+        """Imprime los mensajes acumulados con print_header y el logger del módulo."""
+        for level, message in self.records:
+            if level is None:
+                print_header(message)
+            else:
+                logger.log(level, message)
+        self.records.clear()
+
+
 def check_python_version():
     """Verifica la versión de Python."""
     print_header("VERIFICANDO VERSIÓN DE PYTHON")
@@ -40,9 +82,14 @@ def check_python_version():
         return False
 
 
-def check_dependencies():
-    """Verifica que todas las dependencias estén instaladas."""
-    print_header("VERIFICANDO DEPENDENCIAS")
+def check_dependencies(log):
+    """
+    Verifica que todas las dependencias estén instaladas.
+    
+    Args:
+        log (_MessageLog): Registro donde se acumulan los mensajes
+    """
+    log.header("VERIFICANDO DEPENDENCIAS")
     
     required_packages = {
         'airflow': 'apache-airflow',
@@ -55,19 +102,24 @@ def check_dependencies():
     all_installed = True
     
     for module_name, package_name in required_packages.items():
-        try:
-            importlib.import_module(module_name)
-            logger.info(f"✓ {package_name}")
-        except ImportError:
-            logger.error(f"❌ {package_name} no instalado")
+        # find_spec sólo localiza el módulo, sin ejecutar su inicialización
+        if importlib.util.find_spec(module_name) is not None:
+            log.info(f"✓ {package_name}")
+        else:
+            log.error(f"❌ {package_name} no instalado")
             all_installed = False
     
     return all_installed
 
 
-def check_project_structure():
-    """Verifica que la estructura del proyecto sea correcta."""
-    print_header("VERIFICANDO ESTRUCTURA DEL PROYECTO")
+def check_project_structure(log):
+    """
+    Verifica que la estructura del proyecto sea correcta.
+    
+    Args:
+        log (_MessageLog): Registro donde se acumulan los mensajes
+    """
+    log.header("VERIFICANDO ESTRUCTURA DEL PROYECTO")
     
     required_dirs = [
         'dags',
@@ -92,22 +144,36 @@ def check_project_structure():
     
     all_exist = True
     
+    # Un único os.scandir por directorio padre en lugar de un stat por ruta
+    listings = {}
+    for parent in {os.path.dirname(p) or '.' for p in required_dirs + required_files}:
+        try:
+            with os.scandir(parent) as entries:
+                listings[parent] = {
+                    entry.name: 'dir' if entry.is_dir() else 'file' if entry.is_file() else None
+                    for entry in entries
+                }
+        except OSError:
+            listings[parent] = {}
+    
+    def kind(path):
+        parent, name = os.path.split(path)
+        return listings[parent or '.'].get(name)
+    
     # Verificar directorios
     for directory in required_dirs:
-        path = Path(directory)
-        if path.exists() and path.is_dir():
-            logger.info(f"✓ Directorio: {directory}")
+        if kind(directory) == 'dir':
+            log.info(f"✓ Directorio: {directory}")
         else:
-            logger.error(f"❌ Directorio faltante: {directory}")
+            log.error(f"❌ Directorio faltante: {directory}")
             all_exist = False
     
     # Verificar archivos
     for file in required_files:
-        path = Path(file)
-        if path.exists() and path.is_file():
-            logger.info(f"✓ Archivo: {file}")
+        if kind(file) == 'file':
+            log.info(f"✓ Archivo: {file}")
         else:
-            logger.error(f"❌ Archivo faltante: {file}")
+            log.error(f"❌ Archivo faltante: {file}")
             all_exist = False
     
     return all_exist
@@ -117,9 +183,6 @@ def check_environment_variables():
     """Verifica que las variables de entorno estén configuradas."""
     print_header("VERIFICANDO VARIABLES DE ENTORNO")
     
-    from dotenv import load_dotenv
-    load_dotenv()
-    
     required_vars = [
         'PROJECT_ROOT',
         'DATA_INPUT_PATH',
@@ -131,7 +194,7 @@ def check_environment_variables():
     all_set = True
     
     for var in required_vars:
-        value = os.getenv(var)
+        value = env(var)
         if value:
             logger.info(f"✓ {var}: {value}")
         else:
@@ -141,21 +204,23 @@ def check_environment_variables():
     return all_set
 
 
-def check_database():
-    """Verifica que la base de datos exista y tenga datos."""
-    print_header("VERIFICANDO BASE DE DATOS")
+def check_database(log):
+    """
+    Verifica que la base de datos exista y tenga datos.
     
-    from dotenv import load_dotenv
-    load_dotenv()
+    Args:
+        log (_MessageLog): Registro donde se acumulan los mensajes
+    """
+    log.header("VERIFICANDO BASE DE DATOS")
     
-    db_path = os.getenv('DB_PATH', 'data/database.db')
+    db_path = env('DB_PATH', 'data/database.db')
     
     if not Path(db_path).exists():
-        logger.error(f"❌ Base de datos no encontrada: {db_path}")
-        logger.info("   Ejecuta: python scripts/create_dummy_db.py")
+        log.error(f"❌ Base de datos no encontrada: {db_path}")
+        log.info("   Ejecuta: python scripts/create_dummy_db.py")
         return False
     
-    logger.info(f"✓ Base de datos encontrada: {db_path}")
+    log.info(f"✓ Base de datos encontrada: {db_path}")
     
     try:
         conn = sqlite3.connect(db_path)
@@ -164,21 +229,21 @@ def check_database():
         # Verificar tabla de origen
         cursor.execute("SELECT COUNT(*) FROM sales_data")
         count = cursor.fetchone()[0]
-        logger.info(f"✓ Tabla 'sales_data': {count} registros")
+        log.info(f"✓ Tabla 'sales_data': {count} registros")
         
         # Verificar tabla de destino
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sales_transformed'")
         if cursor.fetchone():
             cursor.execute("SELECT COUNT(*) FROM sales_transformed")
             count = cursor.fetchone()[0]
-            logger.info(f"✓ Tabla 'sales_transformed': {count} registros")
+            log.info(f"✓ Tabla 'sales_transformed': {count} registros")
         else:
-            logger.info("ℹ Tabla 'sales_transformed' vacía (se llenará al ejecutar el pipeline)")
+            log.info("ℹ Tabla 'sales_transformed' vacía (se llenará al ejecutar el pipeline)")
         
         conn.close()
         return True
     except Exception as e:
-        logger.error(f"❌ Error verificando base de datos: {e}")
+        log.error(f"❌ Error verificando base de datos: {e}")
         return False
 
 
@@ -191,7 +256,7 @@ def check_airflow_installation():
         logger.info(f"✓ Airflow versión: {airflow.__version__}")
         
         # Verificar AIRFLOW_HOME
-        airflow_home = os.getenv('AIRFLOW_HOME')
+        airflow_home = env('AIRFLOW_HOME')
         if airflow_home:
             logger.info(f"✓ AIRFLOW_HOME: {airflow_home}")
             
@@ -284,14 +349,31 @@ def main():
         'DAG Validity': check_dag_validity,
     }
     
+    # Las verificaciones de E/S que no importan Airflow corren en paralelo
+    # y acumulan sus mensajes; el resto se ejecuta en el hilo principal
+    pooled = ['Dependencies', 'Project Structure', 'Database']
+    logs = {check_name: _MessageLog() for check_name in pooled}
+    
     results = {}
     
-    for check_name, check_func in checks.items():
-        try:
-            results[check_name] = check_func()
-        except Exception as e:
-            logger.error(f"❌ Error en verificación '{check_name}': {e}")
-            results[check_name] = False
+    with ThreadPoolExecutor(max_workers=len(pooled)) as executor:
+        futures = {
+            check_name: executor.submit(checks[check_name], logs[check_name])
+            for check_name in pooled
+        }
+        
+        for check_name, check_func in checks.items():
+            try:
+                if check_name in futures:
+                    try:
+                        results[check_name] = futures[check_name].result()
+                    finally:
+                        logs[check_name].emit()
+                else:
+                    results[check_name] = check_func()
+            except Exception as e:
+                logger.error(f"❌ Error en verificación '{check_name}': {e}")
+                results[check_name] = False
     
     print_summary(results)
     
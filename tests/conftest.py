@@ -0,0 +1,143 @@
+"""
+Fixtures compartidas por los tests del proyecto.
+
+Los DataFrames de ejemplo se construyen una sola vez por sesión; cada test
+recibe una copia superficial propia (comparte los arrays de la plantilla)
+porque las funciones del pipeline reasignan columnas de su entrada.
+"""
+
+import functools
+import sqlite3
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from config.db_config import db_config
+from scripts.create_dummy_db import create_database_tables
+
+# Fechas del DataFrame de ventas, ya parseadas
+_SALES_DATES = np.array(
+    ['2023-01-01', '2023-01-02', '2023-01-03', '2023-01-04', '2023-01-05'],
+    dtype='datetime64[ns]'
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _template(kind):
+    """
+    Construye una sola vez la plantilla de DataFrame de ejemplo indicada.
+    
+    Args:
+        kind (str): 'ventas', 'extraido' o 'transformado'
+        
+    Returns:
+        pd.DataFrame: Plantilla compartida; no debe modificarse
+    """
+    return _TEMPLATE_BUILDERS[kind]()
+
+
+def _build_sales_dataframe():
+    """DataFrame de ventas de ejemplo."""
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'fecha': _SALES_DATES,
+        'producto': ['Laptop', 'Mouse', 'Teclado', 'Monitor', 'Webcam'],
+        'categoria': ['Computadoras', 'Accesorios', 'Accesorios', 'Computadoras', 'Accesorios'],
+        'region': ['Norte', 'Sur', 'Este', 'Oeste', 'Centro'],
+        'cantidad': [1, 2, 3, 1, 2],
+        'precio_unitario': [1000.0, 25.0, 75.0, 500.0, 100.0],
+        'descuento': [0.1, 0.0, np.nan, 0.05, 0.0],
+        'total_venta': [900.0, 50.0, 225.0, 475.0, 200.0]
+    })
+
+
+def _build_extracted_dataframe():
+    """DataFrame extraído de ejemplo, con fechas como texto."""
+    return pd.DataFrame({
+        'id': [1, 2, 3],
+        'fecha': ['2023-01-01', '2023-01-02', '2023-01-03'],
+        'producto': ['Laptop', 'Mouse', 'Teclado'],
+        'cantidad': [1, 2, 3],
+        'precio_unitario': [1000.0, 25.0, 75.0],
+        'total_venta': [1000.0, 50.0, 225.0]
+    })
+
+
+def _build_transformed_dataframe():
+    """DataFrame transformado de ejemplo."""
+    return pd.DataFrame({
+        'fecha': ['2023-01-01', '2023-01-02', '2023-01-03'],
+        'producto': ['Laptop', 'Mouse', 'Teclado'],
+        'categoria': ['Computadoras', 'Accesorios', 'Accesorios'],
+        'region': ['Norte', 'Sur', 'Este'],
+        'cantidad_total': [10, 20, 30],
+        'precio_promedio': [1000.0, 25.0, 75.0],
+        'descuento_promedio': [0.1, 0.05, 0.0],
+        'total_venta': [9000.0, 475.0, 2250.0],
+        'num_transacciones': [5, 10, 15]
+    })
+
+
+_TEMPLATE_BUILDERS = {
+    'ventas': _build_sales_dataframe,
+    'extraido': _build_extracted_dataframe,
+    'transformado': _build_transformed_dataframe,
+}
+
+
+@pytest.fixture
+def sample_dataframe():
+    """Copia del DataFrame de ventas de ejemplo para un test."""
+    return _template('ventas').copy(deep=False)
+
+
+@pytest.fixture
+def sample_extracted_dataframe():
+    """Copia del DataFrame extraído de ejemplo para un test."""
+    return _template('extraido').copy(deep=False)
+
+
+@pytest.fixture
+def sample_transformed_dataframe():
+    """Copia del DataFrame transformado de ejemplo para un test."""
+    return _template('transformado').copy(deep=False)
+
+
+@pytest.fixture(scope="session")
+def _memory_db():
+    """
+    Base SQLite en memoria (caché compartida) con el esquema del proyecto.
+    
+    Se crea una vez por sesión con el DDL de `create_dummy_db`, a través de
+    `db_config` apuntado a esta conexión, y la tabla de origen contiene las
+    filas de `sample_dataframe`.
+    """
+    conn = sqlite3.connect(
+        "file:testdb?mode=memory&cache=shared", uri=True, check_same_thread=False
+    )
+    
+    template = _template('ventas')
+    df = template.assign(fecha=template['fecha'].dt.strftime('%Y-%m-%d'))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db_config, '_get_or_create_connection', lambda: conn)
+        create_database_tables()
+        db_config.insert_dataframe(df, db_config.table_source)
+    
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def sqlite_db(_memory_db, monkeypatch):
+    """
+    Apunta el pool de lectura de `db_config` a la base en memoria.
+    
+    Los lectores prestados por `db_config.reader()` son la conexión en
+    memoria; la caché de esquema se descarta antes y después del test.
+    """
+    monkeypatch.setattr(db_config, 'acquire_reader', lambda: _memory_db)
+    monkeypatch.setattr(db_config, 'release_reader', lambda conn: None)
+    db_config.invalidate_schema_cache()
+    yield _memory_db
+    db_config.invalidate_schema_cache()
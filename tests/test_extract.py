@@ -4,14 +4,7 @@ Tests para el módulo de extracción de datos.
 
 import pytest
 import pandas as pd
-import sqlite3
-import os
-import sys
-from pathlib import Path
-
-# Agregar el directorio raíz al path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+from pandas.testing import assert_frame_equal
 
 from scripts.extract_data import (
     extract_data_from_db,
@@ -23,50 +16,57 @@ from scripts.extract_data import (
 class TestExtractData:
     """Tests para el módulo de extracción."""
     
-    @pytest.fixture
-    def sample_dataframe(self):
-        """Crea un DataFrame de ejemplo para tests."""
-        return pd.DataFrame({
-            'id': [1, 2, 3],
-            'fecha': ['2023-01-01', '2023-01-02', '2023-01-03'],
-            'producto': ['Laptop', 'Mouse', 'Teclado'],
-            'cantidad': [1, 2, 3],
-            'precio_unitario': [1000.0, 25.0, 75.0],
-            'total_venta': [1000.0, 50.0, 225.0]
-        })
+    def test_extract_data_from_db(self, sqlite_db, sample_dataframe):
+        """Test que extrae todas las filas de la tabla de origen."""
+        df = extract_data_from_db()
+        
+        assert len(df) == len(sample_dataframe)
+        assert df['id'].tolist() == sample_dataframe['id'].tolist()
+        assert 'created_at' in df.columns
+    
+    def test_extract_data_from_db_filters(self, sqlite_db):
+        """Test que aplica el filtro de fecha y el límite."""
+        df = extract_data_from_db(date_filter='2023-01-03', limit=2)
+        
+        assert len(df) == 2
+        assert (df['fecha'] >= '2023-01-03').all()
     
-    def test_validate_extracted_data_valid(self, sample_dataframe):
+    def test_validate_extracted_data_valid(self, sample_extracted_dataframe):
         """Test que valida datos correctos."""
-        result = validate_extracted_data(sample_dataframe)
+        result = validate_extracted_data(sample_extracted_dataframe)
         assert result is True
     
-    def test_validate_extracted_data_empty(self):
-        """Test que detecta DataFrame vacío."""
-        df = pd.DataFrame()
-        result = validate_extracted_data(df)
-        assert result is False
-    
-    def test_validate_extracted_data_missing_columns(self):
-        """Test que detecta columnas faltantes."""
-        df = pd.DataFrame({
+    @pytest.mark.parametrize("df", [
+        pd.DataFrame(),
+        pd.DataFrame({
             'id': [1, 2, 3],
             'fecha': ['2023-01-01', '2023-01-02', '2023-01-03']
-        })
+        }),
+    ], ids=["empty", "missing_columns"])
+    def test_validate_extracted_data_invalid(self, df):
+        """Test que detecta DataFrame vacío o con columnas faltantes."""
         result = validate_extracted_data(df)
         assert result is False
     
-    def test_save_extracted_data(self, sample_dataframe, tmp_path):
-        """Test que guarda datos correctamente."""
-        output_path = str(tmp_path)
-        filename = 'test_extracted.csv'
+    @pytest.mark.parametrize("fmt", ["csv", "parquet"])
+    def test_save_extracted_data(self, sample_extracted_dataframe, tmp_path, fmt):
+        """Test que guarda datos correctamente en cada formato soportado."""
+        filename = f'test_extracted.{fmt}'
+        file_path = tmp_path / filename
         
-        save_extracted_data(sample_dataframe, output_path, filename)
+        save_extracted_data(sample_extracted_dataframe, tmp_path, filename)
         
         # Verificar que el archivo existe
-        file_path = os.path.join(output_path, filename)
-        assert os.path.exists(file_path)
+        assert file_path.is_file()
         
-        # Verificar contenido
-        df_loaded = pd.read_csv(file_path)
-        assert len(df_loaded) == len(sample_dataframe)
-        assert list(df_loaded.columns) == list(sample_dataframe.columns)
+        # Verificar contenido (CSV con tipos explícitos y sin inferir fechas)
+        if fmt == 'parquet':
+            df_loaded = pd.read_parquet(file_path)
+        else:
+            df_loaded = pd.read_csv(
+                file_path,
+                dtype={'id': 'int64', 'cantidad': 'int64'},
+                parse_dates=False,
+                engine='c'
+            )
+        assert_frame_equal(df_loaded, sample_extracted_dataframe)
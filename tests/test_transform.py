@@ -2,41 +2,59 @@
 Tests para el módulo de transformación de datos.
 """
 
-import pytest
 import pandas as pd
 import numpy as np
-import sys
-from pathlib import Path
-
-# Agregar el directorio raíz al path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
 
 from scripts.transform_data import (
     clean_data,
     transform_data,
-    aggregate_data
+    aggregate_data,
+    save_transformed_data
 )
 
+# Columnas base de los DataFrames de ventas construidos en los tests; se
+# comparten entre tests porque las funciones del pipeline reasignan columnas
+# en lugar de escribir sobre los arrays
+_BASE_SALES = {
+    'id': np.arange(1, 4, dtype=np.int64),
+    'fecha': np.array(['2023-01-01', '2023-01-02', '2023-01-03'], dtype='datetime64[ns]'),
+    'producto': np.array(['Laptop', 'Mouse', 'Teclado'], dtype=object),
+    'categoria': np.array(['Computadoras', 'Accesorios', 'Accesorios'], dtype=object),
+    'region': np.array(['Norte', 'Sur', 'Este'], dtype=object),
+    'cantidad': np.array([1, 2, 3], dtype=np.int64),
+    'precio_unitario': np.array([1000.0, 25.0, 75.0]),
+    'descuento': np.array([0.1, 0.0, 0.0]),
+    'total_venta': np.array([900.0, 50.0, 225.0]),
+}
+
+
+def build_sales(**overrides):
+    """
+    Construye un DataFrame de ventas a partir de las columnas base.
+    
+    Args:
+        **overrides: Columnas que reemplazan a las de `_BASE_SALES`
+        
+    Returns:
+        pd.DataFrame: DataFrame que adopta los arrays sin copiarlos
+    """
+    return pd.DataFrame({**_BASE_SALES, **overrides}, copy=False)
+
+
+# Columnas que debe producir aggregate_data
+EXPECTED_AGG_COLUMNS = frozenset({
+    'fecha', 'producto', 'categoria', 'region',
+    'cantidad_total', 'precio_promedio', 'descuento_promedio',
+    'total_venta', 'num_transacciones'
+})
+
+# Categorías válidas de categoria_venta
+VALID_SALE_CATEGORIES = frozenset({'Pequeña', 'Mediana', 'Grande', 'Premium'})
+
 
 class TestTransformData:
     """Tests para el módulo de transformación."""
     
-    @pytest.fixture
-    def sample_dataframe(self):
-        """Crea un DataFrame de ejemplo para tests."""
-        return pd.DataFrame({
-            'id': [1, 2, 3, 4, 5],
-            'fecha': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03', '2023-01-04', '2023-01-05']),
-            'producto': ['Laptop', 'Mouse', 'Teclado', 'Monitor', 'Webcam'],
-            'categoria': ['Computadoras', 'Accesorios', 'Accesorios', 'Computadoras', 'Accesorios'],
-            'region': ['Norte', 'Sur', 'Este', 'Oeste', 'Centro'],
-            'cantidad': [1, 2, 3, 1, 2],
-            'precio_unitario': [1000.0, 25.0, 75.0, 500.0, 100.0],
-            'descuento': [0.1, 0.0, np.nan, 0.05, 0.0],
-            'total_venta': [900.0, 50.0, 225.0, 475.0, 200.0]
-        })
-    
     def test_clean_data_removes_nulls(self, sample_dataframe):
         """Test que clean_data maneja valores nulos correctamente."""
         df_clean = clean_data(sample_dataframe)
@@ -46,17 +64,8 @@ class TestTransformData:
     
     def test_clean_data_removes_duplicates(self):
         """Test que clean_data elimina duplicados."""
-        df = pd.DataFrame({
-            'id': [1, 1, 2],
-            'fecha': pd.to_datetime(['2023-01-01', '2023-01-01', '2023-01-02']),
-            'producto': ['Laptop', 'Laptop', 'Mouse'],
-            'categoria': ['Computadoras', 'Computadoras', 'Accesorios'],
-            'region': ['Norte', 'Norte', 'Sur'],
-            'cantidad': [1, 1, 2],
-            'precio_unitario': [1000.0, 1000.0, 25.0],
-            'descuento': [0.1, 0.1, 0.0],
-            'total_venta': [900.0, 900.0, 50.0]
-        })
+        # Las dos primeras filas son idénticas
+        df = build_sales().take([0, 0, 1])
         
         df_clean = clean_data(df)
         
@@ -65,17 +74,7 @@ class TestTransformData:
     
     def test_clean_data_removes_invalid_quantities(self):
         """Test que clean_data elimina cantidades inválidas."""
-        df = pd.DataFrame({
-            'id': [1, 2, 3],
-            'fecha': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03']),
-            'producto': ['Laptop', 'Mouse', 'Teclado'],
-            'categoria': ['Computadoras', 'Accesorios', 'Accesorios'],
-            'region': ['Norte', 'Sur', 'Este'],
-            'cantidad': [1, 0, -1],  # Cantidades inválidas
-            'precio_unitario': [1000.0, 25.0, 75.0],
-            'descuento': [0.1, 0.0, 0.0],
-            'total_venta': [900.0, 50.0, 225.0]
-        })
+        df = build_sales(cantidad=np.array([1, 0, -1]))  # Cantidades inválidas
         
         df_clean = clean_data(df)
         
@@ -83,6 +82,16 @@ class TestTransformData:
         assert len(df_clean) == 1
         assert df_clean['cantidad'].iloc[0] == 1
     
+    def test_clean_data_returns_new_dataframe(self, sample_dataframe):
+        """Test que transformar la salida de clean_data no altera su entrada."""
+        original_columns = list(sample_dataframe.columns)
+        
+        df_clean = clean_data(sample_dataframe)
+        transform_data(df_clean)
+        
+        assert df_clean is not sample_dataframe
+        assert list(sample_dataframe.columns) == original_columns
+    
     def test_transform_data_adds_date_components(self, sample_dataframe):
         """Test que transform_data agrega componentes de fecha."""
         df_transformed = transform_data(sample_dataframe)
@@ -93,6 +102,14 @@ class TestTransformData:
         assert 'dia' in df_transformed.columns
         assert 'trimestre' in df_transformed.columns
     
+    def test_transform_data_handles_missing_dates(self):
+        """Test que transform_data tolera fechas nulas (NaT)."""
+        fechas = np.array(['2023-01-01', 'NaT', '2023-01-03'], dtype='datetime64[ns]')
+        df_transformed = transform_data(build_sales(fecha=fechas))
+        
+        assert df_transformed['año'].isna().tolist() == [False, True, False]
+        assert df_transformed['nombre_dia'].isna().tolist() == [False, True, False]
+    
     def test_transform_data_adds_calculated_metrics(self, sample_dataframe):
         """Test que transform_data calcula métricas derivadas."""
         df_transformed = transform_data(sample_dataframe)
@@ -110,8 +127,7 @@ class TestTransformData:
         assert 'categoria_venta' in df_transformed.columns
         
         # Verificar que las categorías son válidas
-        valid_categories = ['Pequeña', 'Mediana', 'Grande', 'Premium']
-        assert all(cat in valid_categories for cat in df_transformed['categoria_venta'].unique())
+        assert df_transformed['categoria_venta'].isin(VALID_SALE_CATEGORIES).all()
     
     def test_aggregate_data_reduces_rows(self, sample_dataframe):
         """Test que aggregate_data reduce el número de filas."""
@@ -127,11 +143,16 @@ class TestTransformData:
         df_aggregated = aggregate_data(df_clean)
         
         # Verificar columnas esperadas
-        expected_columns = [
-            'fecha', 'producto', 'categoria', 'region',
-            'cantidad_total', 'precio_promedio', 'descuento_promedio',
-            'total_venta', 'num_transacciones'
-        ]
-        
-        for col in expected_columns:
-            assert col in df_aggregated.columns
+        assert EXPECTED_AGG_COLUMNS.issubset(df_aggregated.columns)
+    
+    def test_save_transformed_data_keeps_plain_dtypes(self, sample_dataframe, tmp_path):
+        """Test que la salida completa se guarda con tipos de texto y enteros estándar."""
+        df_transformed = transform_data(clean_data(sample_dataframe))
+        
+        save_transformed_data(df_transformed, tmp_path, 'full.parquet')
+        df_loaded = pd.read_parquet(tmp_path / 'full.parquet')
+        
+        assert df_loaded['nombre_dia'].dtype == object
+        assert df_loaded['categoria_venta'].dtype == object
+        assert df_loaded['producto'].dtype == object
+        assert df_loaded['año'].dtype == 'int32'